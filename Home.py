@@ -16,6 +16,12 @@ to help you understand and analyze different financial instruments.
    - Model cash flows and payment structures
    - Essential for ABS investors and analysts
 
+#### 📈 Portfolio
+
+1. **Portfolio Analytics** (pages/01_Portfolio_Analytics.py)
+   - Filter onboarded companies by jurisdiction, exchange, offering size and window
+   - Compare groups of companies side by side
+
 #### 🤖 AI-Powered Tools
 
 1. **Onboarding Agent** (pages/00_OnboardingAgent.py)
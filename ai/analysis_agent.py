@@ -1,13 +1,31 @@
-from langchain.chat_models import ChatOpenAI
-from langchain.document_loaders import PyPDFLoader, Docx2txtLoader, TextLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain.prompts import ChatPromptTemplate
+import copy
+import logging
 import os
 import tempfile
-from dotenv import load_dotenv
+
+from ai.incremental import (
+    REVISION_OVERLAP,
+    build_snapshot,
+    context_for_update,
+    merge_update,
+    plan_update,
+    revision_overlap,
+)
+from ai.ocr import OcrPipeline
+from ai.prompt_builder import PromptBuilder
+from ai.typed_fields import type_record
+from utils.tracing import span, traced
+
+# The LangChain, OpenAI and PDF stacks are imported inside the methods that use
+# them, so pages importing this module stay cheap until an analysis actually runs.
+
+logger = logging.getLogger(__name__)
 
 class CompanyAnalysisAgent:
-    def __init__(self, model_name):
+    def __init__(self, model_name, ocr=None):
+        from dotenv import load_dotenv
+        from langchain.chat_models import ChatOpenAI
+
         # Load environment variables and initialize OpenAI
         load_dotenv()
         
@@ -16,6 +34,9 @@ class CompanyAnalysisAgent:
             temperature=0
         )
         
+        # Scanned PDF pages are OCR'd before analysis
+        self.ocr = ocr if ocr is not None else OcrPipeline()
+        
         # Load the analysis agent template
         template_path = os.path.join('prompts', 'analysis_agent.md')
         try:
@@ -24,44 +45,17 @@ class CompanyAnalysisAgent:
         except FileNotFoundError:
             raise Exception(f"Analysis template not found at {template_path}")
             
-        self.prompt = ChatPromptTemplate.from_template(
-            """You are an expert financial analyst and due diligence specialist. Your task is to analyze company documents 
-            and extract relevant information according to the provided template structure.
-
-            Instructions:
-            1. Carefully read and analyze the provided document
-            2. Extract all relevant information that matches the template sections
-            3. For each piece of information:
-               - Ensure accuracy of extracted data
-               - Keep numerical values in their original format
-               - Maintain proper context
-               - Include source context where relevant
-            4. Format the response as follows:
-               # Section Name
-               field_name: extracted value
-               
-            5. Special handling:
-               - For missing information, skip the field rather than leaving it empty
-               - For numerical values, maintain original units and formatting
-               - For dates, use consistent YYYY-MM-DD format
-               - For lists (like Board Members), use comma-separated values
-               - For longer text fields, maintain paragraph structure
-            
-            Template Structure:
-            {template}
-            
-            Document content:
-            {content}
-            
-            Please analyze the document and extract information following the template structure above.
-            Be thorough but only include information that is explicitly present in the document.
-            """
-        )
+        # Instructions and the compacted template form a byte-stable prefix that
+        # the provider can cache; only the document changes between calls
+        self.prompt_builder = PromptBuilder(self.template, model_name)
 
     def _load_document(self, uploaded_file):
+        from langchain.document_loaders import PyPDFLoader, Docx2txtLoader, TextLoader
+
         # Save uploaded file temporarily
+        file_bytes = uploaded_file.getvalue()
         with tempfile.NamedTemporaryFile(delete=False) as tmp_file:
-            tmp_file.write(uploaded_file.getvalue())
+            tmp_file.write(file_bytes)
             file_path = tmp_file.name
             
         try:
@@ -74,7 +68,21 @@ class CompanyAnalysisAgent:
             else:  # txt
                 loader = TextLoader(file_path)
                 
-            documents = loader.load()
+            with span("load_text", file_type=file_extension):
+                documents = loader.load()
+            
+            if file_extension == 'pdf':
+                try:
+                    with span("ocr", pages=len(documents)):
+                        self.ocr.apply(documents, file_path, file_bytes)
+                except ImportError:
+                    # OCR stack not installed; continue with the text layer only
+                    logger.info("OCR packages not installed; using the text layer of %s", uploaded_file.name)
+                except Exception:
+                    # A missing Tesseract binary, an unreadable page or a crashed
+                    # worker must not fail the analysis; fall back to the text layer
+                    logger.warning("OCR failed for %s; using the text layer only", uploaded_file.name,
+                                   exc_info=True)
             
             # Clean up temporary file
             os.unlink(file_path)
@@ -85,7 +93,10 @@ class CompanyAnalysisAgent:
                 os.unlink(file_path)
             raise e
 
+    @traced("split_documents")
     def _split_documents(self, documents):
+        from langchain.text_splitter import RecursiveCharacterTextSplitter
+
         text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=2000,
             chunk_overlap=200
@@ -129,20 +140,98 @@ class CompanyAnalysisAgent:
                     
         return extracted_data, debug_info
 
-    def analyze_document(self, uploaded_file):
-        documents = self._load_document(uploaded_file)
-        splits = self._split_documents(documents)
-        content = " ".join([doc.page_content for doc in splits])
+    def _extract(self, content, sections=None):
+        """Run the extraction prompt and parse the response"""
+        with span("build_prompt"):
+            messages, prompt_report = self.prompt_builder.messages(content, sections)
         
-        messages = self.prompt.format_messages(
-            template=self.template,
-            content=content
-        )
-        
-        response = self.llm.invoke(messages)
+        with span("llm_invoke") as llm_span:
+            response = self.llm.invoke(messages)
+            llm_span.set(**{f"prompt.{key}": value for key, value in prompt_report.items()})
         
         try:
-            extracted_data, debug_info = self._parse_markdown_response(response.content)
-            return extracted_data, debug_info
+            with span("parse_response"):
+                extracted_data, debug_info = self._parse_markdown_response(response.content)
         except Exception as e:
             raise Exception(f"Failed to parse response: {str(e)}")
+        debug_info['prompt'] = prompt_report
+        return extracted_data, debug_info
+
+    def _analyze_revision(self, text, snapshot):
+        """Re-extract only the sections affected by changes since the snapshot"""
+        with span("plan_update"):
+            plan = plan_update(snapshot, text, self.template)
+        incremental = {
+            'total_chunks': len(plan['chunks']),
+            'added_chunks': len(plan['added']),
+            'removed_chunks': len(plan['removed']),
+            'reextracted_sections': plan['sections']
+        }
+        
+        if not plan['sections']:
+            debug_info = {
+                'raw_response': '',
+                'parsed_sections': [],
+                'skipped_lines': [],
+                'incremental': incremental
+            }
+            return copy.deepcopy(snapshot['extracted_data']), debug_info
+        
+        delta, debug_info = self._extract(
+            context_for_update(snapshot, plan),
+            sections=plan['sections']
+        )
+        debug_info['incremental'] = incremental
+        return merge_update(snapshot, plan, delta), debug_info
+
+    @traced("analyze_document", root=True)
+    def analyze_document(self, uploaded_file, snapshot_store=None, semantic_cache=None):
+        """Analyze a document, incrementally when a snapshot of an earlier version exists.
+
+        With a snapshot_store, the result is diffed against the previous
+        analysis of a document with the same name, if enough of its content
+        is unchanged, and only changed sections are re-extracted. With a
+        semantic_cache, a near-duplicate of any earlier document is used as
+        the previous version instead.
+        """
+        with span("load_document"):
+            documents = self._load_document(uploaded_file)
+        text = "\n\n".join(doc.page_content for doc in documents)
+        if not text.strip():
+            raise Exception("No text could be extracted from the document. "
+                            "If it is a scanned PDF, install Tesseract, pytesseract and pypdfium2 for OCR.")
+        
+        snapshot = snapshot_store.load(uploaded_file.name) if snapshot_store else None
+        # A different document uploaded under a reused file name is not a revision
+        if snapshot is not None and revision_overlap(snapshot, text) < REVISION_OVERLAP:
+            snapshot = None
+        match = None
+        if snapshot is None and semantic_cache is not None:
+            with span("semantic_cache_lookup"):
+                match = semantic_cache.lookup(text)
+            if match is not None:
+                snapshot = match['snapshot']
+        
+        if snapshot is not None:
+            extracted_data, debug_info = self._analyze_revision(text, snapshot)
+        else:
+            splits = self._split_documents(documents)
+            content = " ".join([doc.page_content for doc in splits])
+            extracted_data, debug_info = self._extract(content)
+        
+        # Typed amounts, dates and name lists for downstream consumers
+        with span("type_fields"):
+            debug_info['typed_fields'] = type_record(extracted_data)
+        
+        with span("save_snapshot"):
+            new_snapshot = build_snapshot(text, extracted_data)
+            if snapshot_store:
+                snapshot_store.save(uploaded_file.name, new_snapshot)
+            if semantic_cache is not None and (match is None or match['similarity'] < 1.0):
+                semantic_cache.add(text, new_snapshot)
+        if semantic_cache is not None:
+            debug_info['semantic_cache'] = {
+                'similarity': match['similarity'] if match else None,
+                'stats': dict(semantic_cache.stats)
+            }
+        return extracted_data, debug_info
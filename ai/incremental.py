@@ -0,0 +1,261 @@
+"""Chunk-level diffing so amended documents are re-extracted incrementally.
+
+A document's text is split into content-defined chunks: paragraphs are
+grouped and a chunk ends where a paragraph's hash hits a boundary pattern, so
+an edit in one place does not shift the boundaries of the rest. Each
+analysis stores a snapshot of the chunk hashes, the extracted result and the
+chunks each section was sourced from. When a revised document arrives only
+the sections touched by changed chunks are sent back to the LLM.
+"""
+import copy
+import hashlib
+import json
+import os
+import re
+
+MIN_CHUNK_CHARS = 500
+MAX_CHUNK_CHARS = 4000
+BOUNDARY_DIVISOR = 4  # on average every 4th paragraph can end a chunk
+
+# Field values must share this fraction of their words with a chunk to be
+# attributed to it
+SOURCE_COVERAGE = 0.8
+
+# Share of chunks a same-named document must have in common with the stored
+# snapshot to be treated as a revision of it rather than a different document
+REVISION_OVERLAP = 0.5
+
+MONTH_NAMES = ['january', 'february', 'march', 'april', 'may', 'june', 'july', 'august',
+               'september', 'october', 'november', 'december']
+ISO_DATE = re.compile(r'^\s*(\d{4})-(\d{1,2})-(\d{1,2})\s*$')
+
+# Generic words ignored when matching template field labels against new text
+STOP_WORDS = {'and', 'or', 'of', 'per', 'the', 'e', 'g', 'eg', 'date', 'plans', 'description'}
+
+
+def _hash(text):
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _normalize(text):
+    return ' '.join(text.lower().split())
+
+
+def _words(text):
+    return set(re.findall(r'\w+', text.lower()))
+
+
+def _value_word_sets(value):
+    """Word sets any one of which identifies a field value in the source text.
+
+    The model normalises dates to YYYY-MM-DD, which the document rarely
+    spells that way, so a date also matches as '1 May 2023', '1 May',
+    '01.05.2023' and the like.
+    """
+    text = str(value)
+    variants = [_words(text)]
+    match = ISO_DATE.match(text)
+    if match and 1 <= int(match.group(2)) <= 12:
+        year, month, day = (int(part) for part in match.groups())
+        name = MONTH_NAMES[month - 1]
+        for month_word in (name, name[:3]):
+            variants.append({str(year), month_word, str(day)})
+        variants.append({str(year), f"{month:02d}", f"{day:02d}"})
+        variants.append({str(year), str(month), str(day)})
+    return [words for words in variants if words]
+
+
+def content_defined_chunks(text):
+    """Split text into chunks whose boundaries depend only on local content"""
+    paragraphs = [p for p in re.split(r'\n\s*\n', text) if p.strip()]
+    chunks = []
+    current = []
+    size = 0
+    for paragraph in paragraphs:
+        current.append(paragraph)
+        size += len(paragraph)
+        boundary = int(_hash(_normalize(paragraph))[:8], 16) % BOUNDARY_DIVISOR == 0
+        if (boundary and size >= MIN_CHUNK_CHARS) or size >= MAX_CHUNK_CHARS:
+            chunks.append('\n\n'.join(current))
+            current = []
+            size = 0
+    if current:
+        chunks.append('\n\n'.join(current))
+    return chunks
+
+
+def parse_template_sections(template):
+    """Map normalised section names to (title, [field labels]) from the analysis template"""
+    sections = {}
+    current = None
+    for line in template.split('\n'):
+        stripped = line.strip()
+        if stripped.startswith('# '):
+            title = stripped[2:].strip()
+            current = title.lower().replace(' ', '_')
+            sections[current] = (title, [])
+        elif stripped.startswith('- ') and current is not None:
+            sections[current][1].append(stripped[2:].strip())
+    return {key: value for key, value in sections.items() if value[1]}
+
+
+def locate_sources(extracted_data, chunks):
+    """Map each section to the hashes of chunks its field values were found in.
+
+    A field is attributed to every chunk covering SOURCE_COVERAGE of its
+    words; fields that cannot be attributed get an empty source list.
+    """
+    chunk_words = [_words(chunk) for chunk in chunks]
+    chunk_hashes = [_hash(chunk) for chunk in chunks]
+    sources = {}
+    for section, fields in extracted_data.items():
+        if not isinstance(fields, dict):
+            continue
+        section_sources = {}
+        for key, value in fields.items():
+            variants = _value_word_sets(value)
+            section_sources[key] = [
+                chunk_hash for chunk_hash, available in zip(chunk_hashes, chunk_words)
+                if any(len(words & available) >= SOURCE_COVERAGE * len(words) for words in variants)
+            ]
+        sources[section] = section_sources
+    return sources
+
+
+def build_snapshot(text, extracted_data):
+    """Snapshot of an analysed document used to diff the next revision"""
+    chunks = content_defined_chunks(text)
+    return {
+        'chunk_hashes': [_hash(chunk) for chunk in chunks],
+        'sources': locate_sources(extracted_data, chunks),
+        'extracted_data': extracted_data
+    }
+
+
+def revision_overlap(snapshot, text):
+    """Share of chunks text has in common with a snapshot, over the larger document"""
+    hashes = set(_hash(chunk) for chunk in content_defined_chunks(text))
+    previous = set(snapshot['chunk_hashes'])
+    if not hashes or not previous:
+        return 0.0
+    return len(hashes & previous) / max(len(hashes), len(previous))
+
+
+def plan_update(snapshot, text, template):
+    """Work out what has to be re-extracted for a revised document.
+
+    Returns a dict with the new chunks, the added chunk texts, the removed
+    chunk hashes and the sections that need re-extraction. An empty section
+    list means the stored result can be reused as is.
+    """
+    chunks = content_defined_chunks(text)
+    hashes = [_hash(chunk) for chunk in chunks]
+    previous = set(snapshot['chunk_hashes'])
+    current = set(hashes)
+    added = [chunk for chunk, chunk_hash in zip(chunks, hashes) if chunk_hash not in previous]
+    removed = previous - current
+
+    affected = set()
+    # Sections whose source chunks changed
+    for section, fields in snapshot['sources'].items():
+        if any(removed.intersection(found) for found in fields.values()):
+            affected.add(section)
+
+    # Sections whose field labels are mentioned in the new text
+    added_words = _words(' '.join(added))
+    for section, (_, labels) in parse_template_sections(template).items():
+        for label in labels:
+            label_words = _words(label) - STOP_WORDS
+            if label_words and label_words <= added_words:
+                affected.add(section)
+                break
+
+    # New content that does not match any field label still has to be looked at
+    if added and not affected:
+        affected = set(parse_template_sections(template))
+
+    return {
+        'chunks': chunks,
+        'added': added,
+        'removed': removed,
+        'sections': sorted(affected)
+    }
+
+
+def context_for_update(snapshot, plan):
+    """Document text to send for an incremental extraction.
+
+    The added chunks plus the surviving source chunks of the affected
+    sections, in document order.
+    """
+    keep = set()
+    for section in plan['sections']:
+        for found in snapshot['sources'].get(section, {}).values():
+            keep.update(found)
+    added = set(_hash(chunk) for chunk in plan['added'])
+    return '\n\n'.join(
+        chunk for chunk in plan['chunks']
+        if _hash(chunk) in added or _hash(chunk) in keep
+    )
+
+
+def merge_update(snapshot, plan, delta):
+    """Merge re-extracted sections into the stored result.
+
+    Within an affected section, stored fields whose known source chunks
+    were all removed are dropped. Fields that could not be attributed to
+    any chunk (e.g. values the model paraphrased) are kept, since the model
+    is not shown their text again and cannot confirm them. Re-extracted
+    fields replace stored ones. Sections that were not affected are kept
+    unchanged.
+    """
+    merged = copy.deepcopy(snapshot['extracted_data'])
+    removed = plan['removed']
+    for section in plan['sections']:
+        previous_fields = merged.get(section, {})
+        if not isinstance(previous_fields, dict):
+            continue
+        sources = snapshot['sources'].get(section, {})
+        fields = {
+            key: value for key, value in previous_fields.items()
+            if not (sources.get(key) and set(sources[key]) <= removed)
+        }
+        fields.update(delta.get(section, {}))
+        if fields:
+            merged[section] = fields
+        else:
+            merged.pop(section, None)
+
+    # Sections returned by the LLM that were not requested are still new information
+    for section, fields in delta.items():
+        if section not in plan['sections'] and isinstance(fields, dict):
+            merged.setdefault(section, {}).update(fields)
+    return merged
+
+
+class SnapshotStore:
+    """Snapshots of analysed documents kept as JSON files, keyed by document name.
+
+    A name is only a hint: callers check revision_overlap() before treating
+    a stored snapshot as an earlier version of a new upload.
+    """
+
+    def __init__(self, directory=os.path.join('data', 'snapshots')):
+        self.directory = directory
+
+    def _path(self, document_key):
+        safe_name = ''.join(c for c in document_key if c.isalnum() or c in (' ', '-', '_', '.')).strip()
+        return os.path.join(self.directory, f"{safe_name}.json")
+
+    def load(self, document_key):
+        path = self._path(document_key)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def save(self, document_key, snapshot):
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+        with open(self._path(document_key), 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False)
@@ -0,0 +1,119 @@
+"""OCR fallback for scanned PDF pages.
+
+Pages whose extracted text layer is (nearly) empty are rendered to images
+with pypdfium2 and read with a local Tesseract install. Rendering and OCR run
+on a bounded process pool of freshly spawned workers (forking a threaded
+Streamlit server is unsafe), and every result is cached by document hash, page
+and OCR settings so a page is never OCR'd twice.
+"""
+import hashlib
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Pages with less extracted text than this are treated as scanned
+MIN_PAGE_CHARS = 100
+
+
+class OcrCache:
+    """OCR text cached as one file per page"""
+
+    def __init__(self, directory=os.path.join('data', 'ocr_cache')):
+        self.directory = directory
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.txt")
+
+    def get(self, key):
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def set(self, key, text):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so a concurrent reader never sees a partial file
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+
+def low_text_pages(documents, min_chars=MIN_PAGE_CHARS):
+    """Indexes of loaded pages whose text layer is too short to be useful"""
+    return [i for i, doc in enumerate(documents) if len(doc.page_content.strip()) < min_chars]
+
+
+def _ocr_page(args):
+    """Render one PDF page and OCR it; runs in a worker process"""
+    file_path, page_number, dpi, lang = args
+    import pypdfium2 as pdfium
+    import pytesseract
+
+    pdf = pdfium.PdfDocument(file_path)
+    try:
+        image = pdf[page_number].render(scale=dpi / 72).to_pil()
+    finally:
+        pdf.close()
+    return pytesseract.image_to_string(image, lang=lang)
+
+
+class OcrPipeline:
+    """Fills scanned pages of a loaded PDF with OCR text.
+
+    workers bounds the process pool, max_pages caps how many pages of one
+    document are OCR'd, and dpi trades accuracy for speed.
+    """
+
+    def __init__(self, workers=2, dpi=200, lang='eng', max_pages=200, min_chars=MIN_PAGE_CHARS, cache=None):
+        self.workers = workers
+        self.dpi = dpi
+        self.lang = lang
+        self.max_pages = max_pages
+        self.min_chars = min_chars
+        self.cache = cache if cache is not None else OcrCache()
+        self.stats = {'pages_checked': 0, 'pages_ocr': 0, 'cache_hits': 0}
+
+    def _key(self, document_hash, page_number):
+        return hashlib.sha256(
+            f"{document_hash}:{page_number}:{self.dpi}:{self.lang}".encode('utf-8')
+        ).hexdigest()
+
+    def apply(self, documents, file_path, file_bytes):
+        """OCR the low-text pages of documents in place; returns the OCR'd page numbers"""
+        candidates = low_text_pages(documents, self.min_chars)[:self.max_pages]
+        self.stats['pages_checked'] += len(documents)
+        if not candidates:
+            return []
+
+        document_hash = hashlib.sha256(file_bytes).hexdigest()
+        page_numbers = {i: documents[i].metadata.get('page', i) for i in candidates}
+        keys = {i: self._key(document_hash, page_numbers[i]) for i in candidates}
+
+        pending = []
+        for i in candidates:
+            text = self.cache.get(keys[i])
+            if text is None:
+                pending.append(i)
+            else:
+                self.stats['cache_hits'] += 1
+                documents[i].page_content = text
+                documents[i].metadata['ocr'] = True
+
+        if pending:
+            jobs = [(file_path, page_numbers[i], self.dpi, self.lang) for i in pending]
+            if self.workers <= 1 or len(jobs) == 1:
+                texts = [_ocr_page(job) for job in jobs]
+            else:
+                with ProcessPoolExecutor(max_workers=min(self.workers, len(jobs)),
+                                         mp_context=multiprocessing.get_context('spawn')) as executor:
+                    texts = list(executor.map(_ocr_page, jobs))
+            for i, text in zip(pending, texts):
+                self.cache.set(keys[i], text)
+                documents[i].page_content = text
+                documents[i].metadata['ocr'] = True
+            self.stats['pages_ocr'] += len(pending)
+
+        return [page_numbers[i] for i in candidates]
@@ -0,0 +1,183 @@
+"""Near-duplicate document cache keyed by MinHash signatures.
+
+Documents are normalised, shingled into word n-grams and summarised by a
+MinHash signature. Signatures are banded into an LSH index, so a lookup only
+compares against documents sharing at least one band. A match above the
+similarity threshold returns the stored analysis snapshot, which the agent
+reuses as is or patches by re-extracting the chunks that differ.
+
+The cache holds at most max_entries snapshots and evicts the least recently
+used. On disk it is an append-only log of pickled add and evict records, so
+an insert writes one entry; the log is rewritten from the live entries once
+it holds twice as many records as there are entries.
+"""
+import collections
+import os
+import pickle
+import re
+import threading
+import zlib
+
+import numpy as np
+
+NUM_PERM = 128
+BANDS = 16  # 16 bands of 8 rows: candidates from roughly 0.7 similarity up
+SHINGLE_WORDS = 5
+MERSENNE_PRIME = (1 << 31) - 1
+
+
+def normalize_text(text):
+    """Lowercase, strip punctuation and collapse whitespace"""
+    return ' '.join(re.sub(r'[^\w\s]', ' ', text.lower()).split())
+
+
+def shingle_hashes(text, size=SHINGLE_WORDS):
+    """32-bit hashes of the document's word n-grams"""
+    words = normalize_text(text).split()
+    if len(words) < size:
+        words = words + [''] * (size - len(words))
+    shingles = {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+    return np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+
+class SemanticCache:
+    """MinHash + LSH cache of analysis snapshots for near-duplicate documents"""
+
+    def __init__(self, path=None, threshold=0.9, num_perm=NUM_PERM, bands=BANDS, seed=1, max_entries=2000):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.path = path
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, MERSENNE_PRIME, num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, MERSENNE_PRIME, num_perm, dtype=np.uint64)
+
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        # entry id -> (signature, snapshot), least recently used first
+        self.entries = collections.OrderedDict()
+        self.buckets = [{} for _ in range(bands)]
+        self.next_id = 0
+        self.log_records = 0
+        self.stats = {'lookups': 0, 'exact_hits': 0, 'near_hits': 0, 'misses': 0, 'evictions': 0}
+
+        if path and os.path.exists(path):
+            self._load()
+
+    def signature(self, text):
+        """MinHash signature of a document"""
+        hashes = shingle_hashes(text) % MERSENNE_PRIME
+        # (a * x + b) mod p for every permutation and shingle, then the column minimum
+        permuted = (np.outer(self.a, hashes) + self.b[:, None]) % MERSENNE_PRIME
+        return permuted.min(axis=1)
+
+    def _band_keys(self, signature):
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def lookup(self, text):
+        """Best cached entry at or above the threshold, or None.
+
+        Returns a dict with the entry's snapshot and the estimated similarity.
+        """
+        signature = self.signature(text)
+        with self.lock:
+            self.stats['lookups'] += 1
+            candidates = set()
+            for band, key in enumerate(self._band_keys(signature)):
+                candidates.update(self.buckets[band].get(key, ()))
+
+            best, best_similarity = None, 0.0
+            for entry_id in candidates:
+                similarity = float(np.mean(self.entries[entry_id][0] == signature))
+                if similarity > best_similarity:
+                    best, best_similarity = entry_id, similarity
+
+            if best is None or best_similarity < self.threshold:
+                self.stats['misses'] += 1
+                return None
+            # Identical signatures: the documents match on every sampled shingle
+            if best_similarity == 1.0:
+                self.stats['exact_hits'] += 1
+            else:
+                self.stats['near_hits'] += 1
+            self.entries.move_to_end(best)
+            return {'snapshot': self.entries[best][1], 'similarity': best_similarity}
+
+    def _insert(self, entry_id, signature, snapshot):
+        self.entries[entry_id] = (signature, snapshot)
+        for band, key in enumerate(self._band_keys(signature)):
+            self.buckets[band].setdefault(key, []).append(entry_id)
+        self.next_id = max(self.next_id, entry_id + 1)
+
+    def _remove(self, entry_id):
+        signature, _ = self.entries.pop(entry_id)
+        for band, key in enumerate(self._band_keys(signature)):
+            ids = self.buckets[band][key]
+            ids.remove(entry_id)
+            if not ids:
+                del self.buckets[band][key]
+
+    def add(self, text, snapshot):
+        """Index a document's analysis snapshot, evicting the least recently used beyond max_entries"""
+        signature = self.signature(text)
+        with self.lock:
+            entry_id = self.next_id
+            self._insert(entry_id, signature, snapshot)
+            records = [('add', entry_id, signature, snapshot)]
+            while len(self.entries) > self.max_entries:
+                evicted = next(iter(self.entries))
+                self._remove(evicted)
+                records.append(('evict', evicted))
+                self.stats['evictions'] += 1
+            if self.path:
+                self._append(records)
+        return entry_id
+
+    def hit_rate(self):
+        lookups = self.stats['lookups']
+        return (self.stats['exact_hits'] + self.stats['near_hits']) / lookups if lookups else 0.0
+
+    def _append(self, records):
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        if self.log_records + len(records) > 2 * max(len(self.entries), 1):
+            self._compact()
+            return
+        with open(self.path, 'ab') as f:
+            for record in records:
+                pickle.dump(record, f, protocol=pickle.HIGHEST_PROTOCOL)
+        self.log_records += len(records)
+
+    def _compact(self):
+        """Rewrite the log with one add record per live entry"""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            for entry_id, (signature, snapshot) in self.entries.items():
+                pickle.dump(('add', entry_id, signature, snapshot), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+        self.log_records = len(self.entries)
+
+    def _load(self):
+        with open(self.path, 'rb') as f:
+            while True:
+                try:
+                    record = pickle.load(f)
+                except EOFError:
+                    break
+                except pickle.UnpicklingError:
+                    break  # a record cut short by a crash; everything before it is intact
+                self.log_records += 1
+                if isinstance(record, dict):
+                    # Cache saved as a single pickle by an earlier version
+                    for signature, snapshot in zip(record['signatures'], record['entries']):
+                        self._insert(self.next_id, signature, snapshot)
+                elif record[0] == 'add':
+                    self._insert(*record[1:])
+                elif record[1] in self.entries:
+                    self._remove(record[1])
+        while len(self.entries) > self.max_entries:
+            self._remove(next(iter(self.entries)))
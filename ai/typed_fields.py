@@ -0,0 +1,261 @@
+"""Typed post-processing of parsed extraction results.
+
+The markdown parser returns nested dicts of raw strings. This stage turns
+the fields downstream code computes with (amounts, share counts, dates and
+name lists) into CompanyFields records, and a batch of records into an Arrow
+table, so analytics read typed columns instead of re-parsing strings.
+
+Raw values repeat heavily across a batch ("Not specified", currencies,
+dates) and between revisions of a document, so each parser is memoised on
+the raw string; re-typing a record after an incremental update only parses
+values that actually changed.
+"""
+import multiprocessing
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields
+from datetime import date
+from functools import lru_cache
+
+# Values the model writes when a field is absent
+MISSING = {'', '-', 'n/a', 'na', 'none', 'not specified', 'not provided', 'not available',
+           'not found', 'not mentioned', 'unknown'}
+
+CURRENCY_SYMBOLS = {'€': 'EUR', '$': 'USD', '£': 'GBP'}
+CURRENCY_WORDS = {'eur': 'EUR', 'euro': 'EUR', 'euros': 'EUR', 'usd': 'USD', 'dollar': 'USD',
+                  'dollars': 'USD', 'gbp': 'GBP', 'sek': 'SEK', 'nok': 'NOK', 'dkk': 'DKK',
+                  'chf': 'CHF', 'pln': 'PLN'}
+MULTIPLIERS = {'thousand': 1e3, 'k': 1e3, 'million': 1e6, 'mln': 1e6, 'm': 1e6, 'mn': 1e6,
+               'billion': 1e9, 'bn': 1e9, 'b': 1e9}
+MONTHS = {name: i + 1 for i, name in enumerate(
+    ['january', 'february', 'march', 'april', 'may', 'june', 'july', 'august',
+     'september', 'october', 'november', 'december'])}
+MONTHS.update({name[:3]: number for name, number in list(MONTHS.items())})
+
+# Digits with optional thousands groups and a decimal part, then an optional scale word
+NUMBER_PATTERN = re.compile(r"(-?\d+(?:[\s\u00a0,.']\d{3})*(?:[.,]\d+)?)\s*([a-z]+)?", re.IGNORECASE)
+ISO_DATE = re.compile(r'\b(\d{4})-(\d{1,2})-(\d{1,2})\b')
+NUMERIC_DATE = re.compile(r'\b(\d{1,2})[./](\d{1,2})[./](\d{4})\b')  # day first, as in EU prospectuses
+DAY_MONTH_YEAR = re.compile(r'\b(\d{1,2})(?:st|nd|rd|th)?\s+([a-z]+)\.?,?\s+(\d{4})\b', re.IGNORECASE)
+MONTH_DAY_YEAR = re.compile(r'\b([a-z]+)\.?\s+(\d{1,2})(?:st|nd|rd|th)?,?\s+(\d{4})\b', re.IGNORECASE)
+LIST_SEPARATORS = re.compile(r'\s*(?:;|,|\band\b|\n)\s*')
+PARENTHESES = re.compile(r'\([^)]*\)')
+
+# Typed attribute -> (section, parser key, kind)
+FIELD_SPECS = {
+    'company_name': ('basic_information', '-_company_name', 'text'),
+    'registry_code': ('basic_information', '-_company_registry_code', 'text'),
+    'company_type': ('basic_information', '-_company_type', 'text'),
+    'jurisdiction': ('basic_information', '-_jurisdiction', 'text'),
+    'stock_exchange': ('basic_information', '-_stock_exchange', 'text'),
+    'foundation_date': ('basic_information', '-_foundation_date', 'date'),
+    'maximum_shares': ('share_offering_details', '-_maximum_shares', 'number'),
+    'price_per_share': ('share_offering_details', '-_price_per_share', 'money'),
+    'minimum_subscription': ('share_offering_details', '-_minimum_subscription', 'money'),
+    'offering_start': ('share_offering_details', '-_offering_period_start_date', 'date'),
+    'offering_end': ('share_offering_details', '-_offering_period_end_date', 'date'),
+    'board_members': ('management_structure', '-_board_members', 'list'),
+    'management_team_size': ('management_structure', '-_management_team_size', 'number'),
+    'total_share_capital': ('financial_information', '-_total_share_capital', 'money'),
+    'number_of_shares': ('financial_information', '-_number_of_shares', 'number'),
+    'nominal_value_per_share': ('financial_information', '-_nominal_value_per_share', 'money'),
+    'major_shareholders': ('financial_information', '-_major_shareholders', 'list'),
+}
+
+
+@dataclass(slots=True)
+class CompanyFields:
+    company_name: str = None
+    registry_code: str = None
+    company_type: str = None
+    jurisdiction: str = None
+    stock_exchange: str = None
+    foundation_date: date = None
+    maximum_shares: float = None
+    price_per_share: float = None
+    minimum_subscription: float = None
+    offering_start: date = None
+    offering_end: date = None
+    board_members: tuple = ()
+    management_team_size: float = None
+    total_share_capital: float = None
+    number_of_shares: float = None
+    nominal_value_per_share: float = None
+    major_shareholders: tuple = ()
+    currency: str = None  # currency of the money fields, from the first one that names it
+    issues: tuple = ()  # (field, raw value) pairs that could not be parsed
+
+
+def is_missing(value):
+    return value is None or str(value).strip().strip('.*').lower() in MISSING
+
+
+def _to_float(digits):
+    """Parse a number written with ',', '.', spaces or apostrophes as separators"""
+    digits = re.sub(r"[\s\u00a0']", '', digits).rstrip('.,')
+    if ',' in digits and '.' in digits:
+        # The later separator is the decimal mark
+        if digits.rfind(',') > digits.rfind('.'):
+            digits = digits.replace('.', '').replace(',', '.')
+        else:
+            digits = digits.replace(',', '')
+    elif ',' in digits:
+        groups = digits.split(',')
+        if len(groups) == 2 and len(groups[1]) != 3:
+            digits = digits.replace(',', '.')  # decimal comma
+        else:
+            digits = digits.replace(',', '')
+    elif digits.count('.') > 1:
+        digits = digits.replace('.', '')
+    return float(digits)
+
+
+@lru_cache(maxsize=65536)
+def parse_number(raw):
+    """First number in the text, scaled by a following 'thousand'/'million'/'billion'"""
+    if is_missing(raw):
+        return None
+    match = NUMBER_PATTERN.search(raw)
+    if not match:
+        return None
+    try:
+        value = _to_float(match.group(1))
+    except ValueError:
+        return None
+    suffix = (match.group(2) or '').lower()
+    return value * MULTIPLIERS.get(suffix, 1.0)
+
+
+@lru_cache(maxsize=65536)
+def parse_currency(raw):
+    if is_missing(raw):
+        return None
+    for symbol, code in CURRENCY_SYMBOLS.items():
+        if symbol in raw:
+            return code
+    for word in re.findall(r'[a-z]+', raw.lower()):
+        if word in CURRENCY_WORDS:
+            return CURRENCY_WORDS[word]
+    return None
+
+
+def parse_money(raw):
+    """(amount, ISO currency code) from text like '€1.50', 'EUR 1,50' or '2.5 million euros'"""
+    return parse_number(raw), parse_currency(raw)
+
+
+def _date(year, month, day):
+    try:
+        return date(int(year), int(month), int(day))
+    except (TypeError, ValueError):
+        return None
+
+
+@lru_cache(maxsize=65536)
+def parse_date(raw):
+    """First date in the text: ISO, day-first numeric, '1 May 2023' or 'May 1, 2023'"""
+    if is_missing(raw):
+        return None
+    match = ISO_DATE.search(raw)
+    if match:
+        return _date(*match.groups())
+    match = NUMERIC_DATE.search(raw)
+    if match:
+        day, month, year = match.groups()
+        return _date(year, month, day)
+    match = DAY_MONTH_YEAR.search(raw)
+    if match and match.group(2).lower() in MONTHS:
+        day, month, year = match.groups()
+        return _date(year, MONTHS[month.lower()], day)
+    match = MONTH_DAY_YEAR.search(raw)
+    if match and match.group(1).lower() in MONTHS:
+        month, day, year = match.groups()
+        return _date(year, MONTHS[month.lower()], day)
+    return None
+
+
+@lru_cache(maxsize=65536)
+def parse_list(raw):
+    """Comma, semicolon or 'and' separated names, with parenthesised roles dropped"""
+    if is_missing(raw):
+        return ()
+    items = LIST_SEPARATORS.split(PARENTHESES.sub('', raw))
+    return tuple(item.strip(' .*') for item in items if not is_missing(item))
+
+
+def type_record(data):
+    """CompanyFields from one parsed extraction result"""
+    values = {}
+    issues = []
+    currency = None
+    for name, (section, key, kind) in FIELD_SPECS.items():
+        raw = data.get(section, {}).get(key)
+        if is_missing(raw):
+            continue
+        raw = str(raw)
+        if kind == 'text':
+            value = raw.strip()
+        elif kind == 'list':
+            value = parse_list(raw)
+        elif kind == 'date':
+            value = parse_date(raw)
+        elif kind == 'number':
+            value = parse_number(raw)
+        else:
+            value, code = parse_money(raw)
+            currency = currency or code
+        if value is None:
+            issues.append((name, raw))
+        else:
+            values[name] = value
+    return CompanyFields(currency=currency, issues=tuple(issues), **values)
+
+
+def _type_chunk(records):
+    return [type_record(data) for data in records]
+
+
+def type_batch(records, workers=None, chunksize=512):
+    """Type many records, in worker processes for large batches.
+
+    Returns a dict with the typed records, the number of fields that could
+    not be parsed and throughput in records per second.
+    """
+    records = list(records)
+    start = time.perf_counter()
+    if workers == 1 or len(records) <= chunksize:
+        typed = _type_chunk(records)
+    else:
+        chunks = [records[i:i + chunksize] for i in range(0, len(records), chunksize)]
+        # Spawned, not forked: the Streamlit server calling this is multithreaded
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=multiprocessing.get_context('spawn')) as executor:
+            typed = [record for chunk in executor.map(_type_chunk, chunks) for record in chunk]
+    elapsed = time.perf_counter() - start
+    return {
+        'records': typed,
+        'issues': sum(len(record.issues) for record in typed),
+        'seconds': elapsed,
+        'records_per_second': len(typed) / elapsed if elapsed > 0 else float('inf')
+    }
+
+
+def to_arrow(typed):
+    """Arrow table with one typed column per CompanyFields attribute"""
+    import pyarrow as pa
+
+    kinds = {name: kind for name, (_, _, kind) in FIELD_SPECS.items()}
+    arrow_types = {'text': pa.string(), 'date': pa.date32(), 'number': pa.float64(),
+                   'money': pa.float64(), 'list': pa.list_(pa.string())}
+    columns = {}
+    for field in fields(CompanyFields):
+        if field.name == 'issues':
+            continue
+        arrow_type = arrow_types[kinds.get(field.name, 'text')]
+        values = [getattr(record, field.name) for record in typed]
+        if arrow_type == pa.list_(pa.string()):
+            values = [list(value) for value in values]
+        columns[field.name] = pa.array(values, type=arrow_type)
+    columns['issue_count'] = pa.array([len(record.issues) for record in typed], type=pa.int32())
+    return pa.table(columns)
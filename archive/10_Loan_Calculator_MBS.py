@@ -1,12 +1,5 @@
 import streamlit as st
-import numpy as np
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-
-def calculate_monthly_payment(principal, annual_rate, years):
-    monthly_rate = annual_rate / 12 / 100
-    num_payments = years * 12
-    return principal * (monthly_rate * (1 + monthly_rate)**num_payments) / ((1 + monthly_rate)**num_payments - 1)
+from marco.pricing import calculate_monthly_payment, yearly_schedule
 
 st.title("Mortgage-Backed Securities Calculator")
 
@@ -61,23 +54,17 @@ with col2:
 
 # Additional information
 st.header("Payment Schedule")
-years = list(range(1, wam + 1))
-remaining_balance = []
-interest_paid = []
-principal_paid = []
-
-balance = loan_amount
-for year in years:
-    yearly_payment = monthly_payment * 12
-    yearly_interest = balance * (wac / 100)
-    yearly_principal = yearly_payment - yearly_interest
-    balance = max(0, balance - yearly_principal)
-    
-    remaining_balance.append(balance)
-    interest_paid.append(yearly_interest)
-    principal_paid.append(yearly_principal)
-
-# Create payment visualization
+schedule = yearly_schedule(loan_amount, wac, wam, monthly_payment)
+years = schedule["Year"].tolist()
+remaining_balance = schedule["Remaining Balance"].tolist()
+interest_paid = schedule["Interest Paid"].tolist()
+principal_paid = schedule["Principal Paid"].tolist()
+
+# Create payment visualization (plotly is imported here so the page's
+# calculations do not wait on it)
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
 fig = make_subplots(specs=[[{"secondary_y": True}]])
 
 # Add area traces for principal and interest
@@ -1,41 +1,20 @@
 import streamlit as st
 from ai.analysis_agent import CompanyAnalysisAgent
+from ai.incremental import SnapshotStore
+from utils.prospectus import ProspectusRenderer, validate_data
+from utils.record_store import RecordStore
 import yaml
-import os
 from dotenv import load_dotenv
 import pdfkit
 import tempfile
 from datetime import datetime
 from markdown import markdown
 import base64
-import json
 
-def validate_data(data):
-    """Validate that the extracted data contains required fields"""
-    if not isinstance(data, dict):
-        raise ValueError("Invalid data format - expected dictionary")
-    
-    required_sections = [
-        'basic_information',
-        'share_offering_details',
-        'company_overview'
-    ]
-    
-    missing_sections = [section for section in required_sections if section not in data]
-    if missing_sections:
-        raise ValueError(f"Missing required sections: {', '.join(missing_sections)}")
-    
-    # Validate basic information
-    if not data['basic_information'].get('-_company_name'):
-        raise ValueError("Company name is required")
-    
-    return True
-
-def clean_value(value):
-    """Clean and format value for markdown"""
-    if value is None or value == '':
-        return 'Not provided'
-    return str(value).strip()
+@st.cache_resource
+def get_prospectus_renderer():
+    """Prospectus renderer with its layout compiled once per server"""
+    return ProspectusRenderer()
 
 def json_to_markdown(data):
     """Convert JSON data to formatted markdown with validation and cleaning"""
@@ -44,73 +23,26 @@ def json_to_markdown(data):
     except ValueError as e:
         raise ValueError(f"Data validation failed: {str(e)}")
     
-    md = "# Company Prospectus\n\n"
-    md += f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
-    
-    sections = {
-        'basic_information': "Basic Information",
-        'share_offering_details': "Share Offering Details", 
-        'company_overview': "Company Overview",
-        'management_structure': "Management Structure",
-        'financial_information': "Financial Information",
-        'market_analysis': "Market Analysis",
-        'risk_factors': "Risk Factors",
-        'future_plans': "Future Plans"
-    }
-    
-    for section_key, section_title in sections.items():
-        if section_key in data and isinstance(data[section_key], dict):
-            section_data = data[section_key]
-            if section_data:  # Only add section if it has data
-                md += f"## {section_title}\n\n"
-                for key, value in section_data.items():
-                    if value:  # Only add field if it has a value
-                        clean_key = key.replace('-_', '').replace('_', ' ').title()
-                        clean_val = clean_value(value)
-                        md += f"**{clean_key}**: {clean_val}\n\n"
-    
-    if md == f"# Company Prospectus\n\nGenerated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n":
-        raise ValueError("No valid data found to generate prospectus")
-        
-    return md
+    generated_on = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    return get_prospectus_renderer().render_markdown(data, generated_on)
+
+@st.cache_resource
+def get_record_store():
+    """Shared record store for all sessions"""
+    return RecordStore()
 
 def save_json(data, company_name):
-    """Save JSON data to data folder"""
-    # Create data directory if it doesn't exist
-    data_dir = 'data'
-    if not os.path.exists(data_dir):
-        os.makedirs(data_dir)
-    
-    # Create filename with timestamp and company name
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    safe_company_name = ''.join(c for c in company_name if c.isalnum() or c in (' ', '-', '_')).strip()
-    filename = f"{safe_company_name}_{timestamp}.json"
-    
-    filepath = os.path.join(data_dir, filename)
-    
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-    
-    return filepath
+    """Save JSON data as a new version of the company's record"""
+    store = get_record_store()
+    _, version = store.save(data, company_name)
+    return f"{store.db_path} ({company_name}, version {version})"
 
 def save_markdown(content, company_name):
-    """Save markdown content to data folder"""
-    # Create data directory if it doesn't exist
-    data_dir = 'data'
-    if not os.path.exists(data_dir):
-        os.makedirs(data_dir)
-    
-    # Create filename with timestamp and company name
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    safe_company_name = ''.join(c for c in company_name if c.isalnum() or c in (' ', '-', '_')).strip()
-    filename = f"{safe_company_name}_{timestamp}.md"
-    
-    filepath = os.path.join(data_dir, filename)
-    
-    with open(filepath, 'w', encoding='utf-8') as f:
-        f.write(content)
-    
-    return filepath
+    """Attach markdown content to the latest version of the company's record"""
+    store = get_record_store()
+    if not store.attach_markdown(company_name, content):
+        store.save(st.session_state.extracted_data, company_name, markdown=content)
+    return f"{store.db_path} ({company_name}, latest version)"
 
 # Load environment variables
 load_dotenv()
@@ -155,7 +87,10 @@ if st.session_state.uploaded_file and not st.session_state.analysis_complete:
         with st.spinner('Analyzing document...'):
             try:
                 analysis_agent = CompanyAnalysisAgent(model_name=st.session_state.selected_model)
-                extracted_data, debug_info = analysis_agent.analyze_document(st.session_state.uploaded_file)
+                extracted_data, debug_info = analysis_agent.analyze_document(
+                    st.session_state.uploaded_file,
+                    snapshot_store=SnapshotStore()
+                )
                 st.session_state.extracted_data = extracted_data
                 st.session_state.debug_info = debug_info
                 st.session_state.analysis_complete = True
@@ -234,9 +169,11 @@ if st.session_state.show_editable:
             company_name = data['basic_information'].get('-_company_name', 'company')
             
             # Save JSON file
-            json_path = save_json(data, company_name)
-            
-            st.success(f'Changes saved successfully! Data written to: {json_path}')
+            try:
+                json_path = save_json(data, company_name)
+                st.success(f'Changes saved successfully! Data written to: {json_path}')
+            except ValueError as e:
+                st.error(f'Validation error: {str(e)}')
 
     # Debug information expander
     with st.expander("Debug Information", expanded=False):
@@ -290,7 +227,7 @@ if st.session_state.show_editable:
                 
                 # Add info about PDF generation
                 st.info('To generate PDF from command line, run:\n' +
-                       f'`python utils/pdf_generator.py {markdown_path}`')
+                       f'`python utils/pdf_generator.py --company "{company_name}"`')
                 
         except ValueError as e:
             st.error(f'Validation error: {str(e)}')
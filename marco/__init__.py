@@ -0,0 +1 @@
+"""Marco calculation engines, usable from the Streamlit pages or batch jobs."""
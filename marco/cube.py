@@ -0,0 +1,217 @@
+"""Memory-mapped cash-flow cubes for large pool and scenario projections.
+
+A cube is a directory with one .npy file per field (interest, principal,
+...) laid out as (series, scenario, period) in C order, plus a meta.json
+describing dimensions and coordinate labels. Every (series, scenario) row
+of periods is contiguous, so reading one tranche under one scenario over all
+months is a zero-copy view of the memory map. Cubes are written in blocks of
+scenarios so the full result never has to sit in memory.
+
+A cube is written into a temporary directory next to its destination and
+moved into place when complete, so readers never see a half-written cube
+and concurrent writers of the same path do not interleave. evict_cubes()
+keeps a cube directory under a size cap, dropping the least recently used.
+"""
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+DEFAULT_CUBE_DIR = os.path.join('data', 'cubes')
+DEFAULT_MAX_CUBE_BYTES = 2 * 1024 ** 3
+DIMS = ('series', 'scenario', 'period')
+TEMP_PREFIX = '.tmp-'
+# Temporary directories older than this were left by a writer that died
+STALE_TEMP_SECONDS = 3600
+
+
+class CubeWriter:
+    """Creates a cube on disk and fills it block by block"""
+
+    def __init__(self, path, fields, series, scenarios, periods, dtype=np.float64, scenario_labels=None):
+        parent = os.path.dirname(os.path.abspath(path))
+        if not os.path.exists(parent):
+            os.makedirs(parent, exist_ok=True)
+        self.path = path
+        self.temp_path = tempfile.mkdtemp(prefix=TEMP_PREFIX, dir=parent)
+        shape = (len(series), scenarios, periods)
+        self.arrays = {
+            field: np.lib.format.open_memmap(
+                os.path.join(self.temp_path, f"{field}.npy"), mode='w+', dtype=dtype, shape=shape
+            )
+            for field in fields
+        }
+        self.meta = {
+            'dims': list(DIMS),
+            'shape': list(shape),
+            'dtype': np.dtype(dtype).str,
+            'fields': list(fields),
+            'coords': {
+                'series': list(series),
+                'scenario': list(scenario_labels) if scenario_labels is not None else list(range(scenarios))
+            }
+        }
+
+    def write(self, field, scenario_start, block):
+        """Write a (series, block_scenarios, periods) block starting at scenario_start"""
+        self.arrays[field][:, scenario_start:scenario_start + block.shape[1], :] = block
+
+    def close(self):
+        """Flush the fields and move the finished cube to its path"""
+        for array in self.arrays.values():
+            array.flush()
+        self.arrays = {}
+        with open(os.path.join(self.temp_path, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f)
+
+        # A directory without meta.json is a partial cube from an older writer
+        if os.path.isdir(self.path) and not os.path.exists(os.path.join(self.path, 'meta.json')):
+            shutil.rmtree(self.path, ignore_errors=True)
+        try:
+            os.replace(self.temp_path, self.path)
+        except OSError:
+            # Another writer published this path first; cube paths are keyed
+            # by their inputs, so its content is the same
+            if not os.path.exists(os.path.join(self.path, 'meta.json')):
+                raise
+            shutil.rmtree(self.temp_path, ignore_errors=True)
+
+    def abort(self):
+        """Discard a cube that will not be completed"""
+        self.arrays = {}
+        shutil.rmtree(self.temp_path, ignore_errors=True)
+
+
+class Cube:
+    """Read-only view of a cube; fields are memory-mapped on first access"""
+
+    def __init__(self, path):
+        with open(os.path.join(path, 'meta.json'), 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        # The directory's modification time is its last use for evict_cubes()
+        os.utime(path)
+        self.path = path
+        self.series = self.meta['coords']['series']
+        self.scenarios = self.meta['coords']['scenario']
+        self._arrays = {}
+
+    @property
+    def fields(self):
+        return self.meta['fields']
+
+    @property
+    def shape(self):
+        return tuple(self.meta['shape'])
+
+    def field(self, name):
+        if name not in self.fields:
+            raise ValueError(f"Unknown field '{name}'; cube has: {', '.join(self.fields)}")
+        if name not in self._arrays:
+            self._arrays[name] = np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode='r')
+        return self._arrays[name]
+
+    def series_index(self, series):
+        return series if isinstance(series, int) else self.series.index(series)
+
+    def slice(self, name, series=None, scenario=None):
+        """View of a field for one series and/or scenario index; None keeps the whole axis"""
+        array = self.field(name)
+        series_key = slice(None) if series is None else self.series_index(series)
+        scenario_key = slice(None) if scenario is None else scenario
+        return array[series_key, scenario_key]
+
+    def nbytes(self):
+        """Size of all fields on disk"""
+        return len(self.fields) * int(np.prod(self.shape)) * np.dtype(self.meta['dtype']).itemsize
+
+
+def _directory_bytes(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def evict_cubes(directory=DEFAULT_CUBE_DIR, max_bytes=DEFAULT_MAX_CUBE_BYTES, keep=()):
+    """Delete least recently used cubes until the directory is under max_bytes.
+
+    Cubes in keep are never deleted; neither are temporary directories of
+    writers still running. Returns the number of cubes deleted.
+    """
+    if not os.path.isdir(directory):
+        return 0
+    keep = {os.path.abspath(path) for path in keep}
+    now = time.time()
+    cubes = []
+    total = 0
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if not os.path.isdir(path):
+            continue
+        try:
+            modified = os.path.getmtime(path)
+        except OSError:
+            continue
+        if name.startswith(TEMP_PREFIX):
+            if now - modified > STALE_TEMP_SECONDS:
+                shutil.rmtree(path, ignore_errors=True)
+            continue
+        size = _directory_bytes(path)
+        total += size
+        cubes.append((modified, path, size))
+
+    removed = 0
+    for _, path, size in sorted(cubes):
+        if total <= max_bytes:
+            break
+        if os.path.abspath(path) in keep:
+            continue
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+        removed += 1
+    return removed
+
+
+def run_waterfall_to_cube(structure, pool_balance, annual_rate, months, cpr, cdr, severity, path,
+                          block_size=256):
+    """Project pool and waterfall scenario by block and stream the results into a cube.
+
+    cpr, cdr and severity are per-scenario arrays (or scalars). Returns the
+    opened Cube and the per-tranche metrics for every scenario.
+    """
+    from marco.waterfall import pool_cashflows, run_waterfall
+
+    cpr, cdr, severity = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(cpr, dtype=np.float64)),
+        np.atleast_1d(np.asarray(cdr, dtype=np.float64)),
+        np.atleast_1d(np.asarray(severity, dtype=np.float64))
+    )
+    scenarios = cpr.shape[0]
+    names = [t.name for t in structure.tranches]
+    fields = ('interest', 'principal', 'writedown', 'balance')
+    writer = CubeWriter(path, fields, names, scenarios, months, scenario_labels=cdr.tolist())
+
+    metrics = {}
+    try:
+        for start in range(0, scenarios, block_size):
+            end = min(start + block_size, scenarios)
+            flows = pool_cashflows(pool_balance, annual_rate, months, cpr[start:end], cdr[start:end],
+                                   severity[start:end])
+            result = run_waterfall(structure, *flows)
+            for field in fields:
+                writer.write(field, start, getattr(result, field))
+            for name, values in result.metrics.items():
+                metrics.setdefault(name, []).append(values)
+    except BaseException:
+        writer.abort()
+        raise
+    writer.close()
+
+    return Cube(path), {name: np.concatenate(blocks, axis=1) for name, blocks in metrics.items()}
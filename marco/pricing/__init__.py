@@ -0,0 +1,53 @@
+"""Loan pricing shared by the calculator pages, batch jobs and the HTTP API."""
+from marco.pricing.cents import cents_schedule, from_cents, to_cents
+from marco.pricing.events import (
+    Balloon,
+    Fee,
+    InterestOnly,
+    Loan,
+    PaymentHoliday,
+    RateReset,
+    effective_rates,
+    event_schedule,
+    portfolio_rates,
+)
+from marco.pricing.grid import ASSET_CLASSES, CREDIT_TIERS, PricingGrid
+from marco.pricing.loans import (
+    calculate_monthly_payment,
+    loan_summary,
+    monthly_schedule,
+    price_loans,
+    yearly_schedule,
+)
+from marco.pricing.risk import pool_risk, risk_measures, yield_from_price
+from marco.pricing.solver import affordability_sweep, max_principal, rate_for_payment, term_for_payment
+
+__all__ = [
+    'ASSET_CLASSES',
+    'Balloon',
+    'CREDIT_TIERS',
+    'Fee',
+    'InterestOnly',
+    'Loan',
+    'PaymentHoliday',
+    'PricingGrid',
+    'RateReset',
+    'affordability_sweep',
+    'calculate_monthly_payment',
+    'cents_schedule',
+    'effective_rates',
+    'event_schedule',
+    'from_cents',
+    'loan_summary',
+    'max_principal',
+    'monthly_schedule',
+    'pool_risk',
+    'portfolio_rates',
+    'price_loans',
+    'rate_for_payment',
+    'risk_measures',
+    'term_for_payment',
+    'to_cents',
+    'yearly_schedule',
+    'yield_from_price',
+]
@@ -0,0 +1,186 @@
+"""HTTP API for batch loan pricing.
+
+Run with:
+    uvicorn marco.pricing.api:app --host 0.0.0.0 --port 8000
+
+Loans are sent column-wise so a batch is evaluated as whole arrays:
+    POST /price     {"principal": [...], "annual_rate": [...], "years": [...]}
+    POST /schedule  same body plus "include_balance" and "exact"; monthly schedules per loan
+                    (exact schedules are integer cents with a final-payment true-up)
+    POST /risk      {"principal": [...], "annual_rate": [...], "months": [...], "annual_yield": [...]}
+    POST /solve     {"solve_for": "principal" | "months" | "rate", "payment": [...], plus the other two terms}
+"""
+from typing import List, Literal, Optional
+
+import numpy as np
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel
+
+from marco.pricing.cents import cents_schedule
+from marco.pricing.loans import monthly_schedule, price_loans
+from marco.pricing.risk import pool_risk, risk_measures
+from marco.pricing.solver import max_principal, rate_for_payment, term_for_payment
+
+MAX_BATCH = 100000
+MAX_SCHEDULE_BATCH = 1000
+# Schedules are (loans, months) arrays, so the term bounds response size and memory
+MAX_YEARS = 50
+# Closed-form risk measures overflow for rates far beyond any real loan
+MAX_ANNUAL_RATE = 1000
+
+app = FastAPI(title="Marco Pricing API")
+
+
+class LoanBatch(BaseModel):
+    principal: List[float]
+    annual_rate: List[float]
+    years: List[int]
+
+
+class ScheduleRequest(LoanBatch):
+    include_balance: bool = True
+    exact: bool = False
+    rounding: Literal['half_even', 'half_up', 'down'] = 'half_even'
+
+
+class RiskBatch(BaseModel):
+    principal: List[float]
+    annual_rate: List[float]
+    months: List[int]
+    annual_yield: Optional[List[float]] = None
+
+
+class SolveBatch(BaseModel):
+    solve_for: Literal['principal', 'months', 'rate']
+    payment: List[float]
+    principal: Optional[List[float]] = None
+    annual_rate: Optional[List[float]] = None
+    years: Optional[List[int]] = None
+    fees: Optional[List[float]] = None
+
+
+# Inputs each solve needs besides the payment
+SOLVE_INPUTS = {
+    'principal': ('annual_rate', 'years'),
+    'months': ('principal', 'annual_rate'),
+    'rate': ('principal', 'years')
+}
+
+
+def _validate(batch, limit):
+    count = len(batch.principal)
+    if len(batch.annual_rate) != count or len(batch.years) != count:
+        raise HTTPException(status_code=422, detail="principal, annual_rate and years must have the same length")
+    if count == 0:
+        raise HTTPException(status_code=422, detail="Batch is empty")
+    if count > limit:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {limit} loans")
+    if min(batch.years) < 1 or min(batch.principal) < 0 or min(batch.annual_rate) < 0:
+        raise HTTPException(status_code=422, detail="Terms must be at least one year; principal and rate non-negative")
+    if max(batch.years) > MAX_YEARS:
+        raise HTTPException(status_code=422, detail=f"Terms must be at most {MAX_YEARS} years")
+
+
+@app.get("/health")
+def health():
+    return {"status": "ok"}
+
+
+@app.post("/price")
+def price(batch: LoanBatch):
+    _validate(batch, MAX_BATCH)
+    return {
+        "count": len(batch.principal),
+        **price_loans(batch.principal, batch.annual_rate, batch.years)
+    }
+
+
+@app.post("/schedule")
+def schedule(request: ScheduleRequest):
+    _validate(request, MAX_SCHEDULE_BATCH)
+    if request.exact:
+        try:
+            result = cents_schedule(request.principal, request.annual_rate, request.years, request.rounding)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        response = {
+            "month": result['month'].tolist(),
+            "unit": "cents",
+            "payment": result['payment'].tolist(),
+            "interest": result['interest'].tolist(),
+            "principal": result['principal'].tolist()
+        }
+        if request.include_balance:
+            response["balance"] = result['balance'].tolist()
+        return response
+
+    result = monthly_schedule(
+        np.asarray(request.principal), np.asarray(request.annual_rate), np.asarray(request.years)
+    )
+    response = {
+        "month": result['month'].tolist(),
+        "interest": result['interest'].round(2).tolist(),
+        "principal": result['principal'].round(2).tolist()
+    }
+    if request.include_balance:
+        response["balance"] = result['balance'].round(2).tolist()
+    return response
+
+
+@app.post("/risk")
+def risk(batch: RiskBatch):
+    count = len(batch.principal)
+    if len(batch.annual_rate) != count or len(batch.months) != count \
+            or (batch.annual_yield is not None and len(batch.annual_yield) != count):
+        raise HTTPException(status_code=422, detail="All columns must have the same length")
+    if count == 0 or count > MAX_BATCH:
+        raise HTTPException(status_code=413 if count else 422, detail=f"Batch must have 1 to {MAX_BATCH} loans")
+    if min(batch.months) < 1 or min(batch.principal) < 0 or min(batch.annual_rate) < 0:
+        raise HTTPException(status_code=422,
+                            detail="Remaining terms must be at least one month; principal and rate non-negative")
+    if max(batch.months) > MAX_YEARS * 12:
+        raise HTTPException(status_code=422, detail=f"Remaining terms must be at most {MAX_YEARS * 12} months")
+    if max(batch.annual_rate) > MAX_ANNUAL_RATE:
+        raise HTTPException(status_code=422, detail=f"Rates must be at most {MAX_ANNUAL_RATE}%")
+    # Negative yields are valid, but at -100% or below the discount factor is undefined
+    if batch.annual_yield is not None and (min(batch.annual_yield) <= -100
+                                           or max(batch.annual_yield) > MAX_ANNUAL_RATE):
+        raise HTTPException(status_code=422, detail=f"Yields must be above -100% and at most {MAX_ANNUAL_RATE}%")
+
+    principal = np.asarray(batch.principal)
+    measures = risk_measures(principal, batch.annual_rate, batch.months, annual_yield=batch.annual_yield)
+    return {
+        "count": count,
+        "pool": pool_risk(measures, principal),
+        **{name: np.atleast_1d(values).tolist() for name, values in measures.items()}
+    }
+
+
+@app.post("/solve")
+def solve(batch: SolveBatch):
+    count = len(batch.payment)
+    required = SOLVE_INPUTS[batch.solve_for]
+    for name in required:
+        if getattr(batch, name) is None:
+            raise HTTPException(status_code=422, detail=f"Solving for {batch.solve_for} needs {' and '.join(required)}")
+    columns = [getattr(batch, name) for name in required] + ([batch.fees] if batch.fees is not None else [])
+    if any(len(column) != count for column in columns):
+        raise HTTPException(status_code=422, detail="All columns must have the same length")
+    if count == 0 or count > MAX_BATCH:
+        raise HTTPException(status_code=413 if count else 422, detail=f"Batch must have 1 to {MAX_BATCH} loans")
+    if batch.years is not None and (min(batch.years) < 1 or max(batch.years) > MAX_YEARS):
+        raise HTTPException(status_code=422, detail=f"Terms must be 1 to {MAX_YEARS} years")
+
+    if batch.solve_for == 'principal':
+        result = max_principal(batch.payment, batch.annual_rate, batch.years)
+    elif batch.solve_for == 'months':
+        result = term_for_payment(batch.principal, batch.annual_rate, batch.payment)
+    else:
+        result = rate_for_payment(batch.principal, batch.payment, batch.years, fees=batch.fees or 0.0)
+
+    # NaN marks queries with no solution; JSON has no NaN so they are returned as null
+    values = np.atleast_1d(result)
+    return {
+        "count": count,
+        batch.solve_for: [None if np.isnan(v) else float(v) for v in values]
+    }
@@ -0,0 +1,100 @@
+"""Exact amortization in integer cents.
+
+Balances, payments and interest are int64 cents and rates are held as
+integers in millionths of a percent, so monthly interest is the exact
+rational balance * rate / RATE_DENOMINATOR rounded with an explicit rule.
+The level payment is rounded to the cent and the final payment is trued up
+to clear the balance, so every schedule reconciles: principal repaid adds up
+to the amount financed and the closing balance is exactly zero.
+
+Rounding makes each month depend on the last, so schedules step through the
+months once, vectorised across all loans in the batch.
+"""
+import numpy as np
+
+from marco.pricing.loans import _payment
+
+RATE_SCALE = 1000000  # annual rates are stored in millionths of a percent
+RATE_DENOMINATOR = 100 * 12 * RATE_SCALE  # percent, months per year, scale
+# Largest balance whose interest numerator fits in int64 at a 100% rate
+MAX_BALANCE_CENTS = np.iinfo(np.int64).max // (100 * RATE_SCALE)
+
+ROUNDING = ('half_even', 'half_up', 'down')
+
+
+def to_cents(amount):
+    """Currency amounts to int64 cents, rounding half to even"""
+    return np.rint(np.asarray(amount, dtype=np.float64) * 100).astype(np.int64)
+
+
+def from_cents(cents):
+    return np.asarray(cents, dtype=np.int64) / 100
+
+
+def round_div(numerator, denominator, rounding='half_even'):
+    """Integer division of int64 arrays with an explicit rounding rule.
+
+    half_even rounds ties to the even cent (banker's rounding), half_up
+    rounds ties towards +infinity and down truncates towards -infinity.
+    """
+    quotient, remainder = np.divmod(numerator, denominator)
+    if rounding == 'down':
+        return quotient
+    twice = 2 * remainder
+    if rounding == 'half_up':
+        return quotient + (twice >= denominator)
+    if rounding == 'half_even':
+        return quotient + ((twice > denominator) | ((twice == denominator) & (quotient % 2 == 1)))
+    raise ValueError(f"Unknown rounding rule '{rounding}'; use one of: {', '.join(ROUNDING)}")
+
+
+def cents_schedule(principal, annual_rate, years, rounding='half_even', monthly_payment=None):
+    """Monthly schedules in int64 cents for a batch of loans.
+
+    Returns arrays shaped (loans, months) for payment, interest, principal
+    and closing balance, zero past each loan's term. The regular payment is
+    the level payment rounded to the cent (or monthly_payment if given); the
+    last payment is whatever clears the balance.
+    """
+    principal = np.atleast_1d(np.asarray(principal, dtype=np.float64))
+    principal, annual_rate, years = np.broadcast_arrays(
+        principal, np.atleast_1d(np.asarray(annual_rate, dtype=np.float64)), np.atleast_1d(years)
+    )
+    if principal.max(initial=0) * 100 > MAX_BALANCE_CENTS:
+        raise ValueError(f"Balances above {MAX_BALANCE_CENTS / 100:,.0f} overflow the cents engine")
+    # MAX_BALANCE_CENTS only bounds the interest numerator for rates up to 100%
+    if annual_rate.max(initial=0) > 100:
+        raise ValueError("The cents engine supports annual rates up to 100%")
+    balance = to_cents(principal)
+    rate = np.rint(annual_rate * RATE_SCALE).astype(np.int64)
+    term = np.asarray(years, dtype=np.int64) * 12
+
+    if monthly_payment is None:
+        monthly_payment = _payment(principal, annual_rate / 12 / 100, term)
+    level = np.broadcast_to(to_cents(monthly_payment), balance.shape)
+
+    horizon = int(term.max())
+    # Rows are months while stepping so each month is one contiguous write
+    shape = (horizon, balance.shape[0])
+    payment = np.zeros(shape, dtype=np.int64)
+    interest = np.zeros(shape, dtype=np.int64)
+    closing = np.zeros(shape, dtype=np.int64)
+
+    for t in range(horizon):
+        active = t < term
+        due = round_div(balance * rate, RATE_DENOMINATOR, rounding)
+        owed = balance + due
+        # A rounded-up level payment can clear the balance early; the last one always does
+        paid = np.where(t == term - 1, owed, np.minimum(level, owed))
+        payment[t] = np.where(active, paid, 0)
+        interest[t] = np.where(active, due, 0)
+        balance = balance - (payment[t] - interest[t])
+        closing[t] = balance
+
+    return {
+        'month': np.arange(1, horizon + 1),
+        'payment': payment.T,
+        'interest': interest.T,
+        'principal': (payment - interest).T,
+        'balance': closing.T
+    }
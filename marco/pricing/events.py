@@ -0,0 +1,236 @@
+"""Event-driven schedules for loans with fees, balloons, holidays and rate resets.
+
+A loan is a principal, an opening rate and a term in months plus a list of
+events. Each loan is compiled into segments: runs of months with a constant
+rate and payment mode (amortising, interest-only or payment holiday).
+Within a segment the balance has a closed form,
+
+    B(e) = B0 q^e - M (q^e - 1) / r,    q = 1 + r,
+
+so a schedule is a few array operations per segment instead of a loop over
+months, and a portfolio is processed segment by segment across all loans at
+once. Amortising segments re-level the payment at their start so the
+balance reaches the balloon at maturity, which is how resets are serviced.
+
+Months are numbered from 1 (the first payment); an event at month m
+applies from payment m onwards. Month 0 is origination.
+"""
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from marco.pricing.risk import ZERO_RATE, _annuity_sums
+
+AMORTISING, INTEREST_ONLY, HOLIDAY = 0, 1, 2
+
+
+@dataclass
+class Fee:
+    amount: float
+    month: int = 0  # 0 is an upfront fee, later months are paid with that payment
+    financed: bool = False  # upfront fees only: added to the balance instead of paid at origination
+
+
+@dataclass
+class RateReset:
+    month: int
+    annual_rate: float
+
+
+@dataclass
+class PaymentHoliday:
+    month: int
+    length: int  # months with no payment; interest is capitalised
+
+
+@dataclass
+class InterestOnly:
+    month: int
+    length: int
+
+
+@dataclass
+class Balloon:
+    amount: float  # balance left to pay with the final payment
+
+
+@dataclass
+class Loan:
+    principal: float
+    annual_rate: float
+    months: int
+    events: list = field(default_factory=list)
+
+
+def _events(loan, kind):
+    return [event for event in loan.events if isinstance(event, kind)]
+
+
+def compile_loan(loan):
+    """Split a loan's term into (start, end, annual_rate, mode) segments.
+
+    A segment covers payments start + 1 .. end.
+    """
+    windows = [(e.month, e.length, HOLIDAY) for e in _events(loan, PaymentHoliday)]
+    windows += [(e.month, e.length, INTEREST_ONLY) for e in _events(loan, InterestOnly)]
+    resets = sorted(_events(loan, RateReset), key=lambda e: e.month)
+
+    cuts = {0, loan.months}
+    for month, length, _ in windows:
+        cuts.update((month - 1, month - 1 + length))
+    cuts.update(e.month - 1 for e in resets)
+    cuts = sorted(c for c in cuts if 0 <= c <= loan.months)
+
+    segments = []
+    for start, end in zip(cuts[:-1], cuts[1:]):
+        rate = loan.annual_rate
+        for reset in resets:
+            if reset.month - 1 <= start:
+                rate = reset.annual_rate
+        mode = AMORTISING
+        # Holidays take precedence over interest-only periods
+        for month, length, kind in sorted(windows, key=lambda w: w[2]):
+            if month - 1 <= start < month - 1 + length:
+                mode = kind
+        segments.append((start, end, rate, mode))
+    return segments
+
+
+def _compile_portfolio(loans):
+    """Pad every loan's segments into (loans, segments) arrays"""
+    compiled = [compile_loan(loan) for loan in loans]
+    count, width = len(loans), max(len(segments) for segments in compiled)
+    start = np.zeros((count, width), dtype=np.int64)
+    end = np.zeros((count, width), dtype=np.int64)
+    rate = np.zeros((count, width))
+    mode = np.full((count, width), AMORTISING, dtype=np.int64)
+    for i, segments in enumerate(compiled):
+        for k, segment in enumerate(segments):
+            start[i, k], end[i, k], rate[i, k], mode[i, k] = segment
+        # Padding segments are empty and sit at maturity
+        start[i, len(segments):] = end[i, len(segments):] = loans[i].months
+    return start, end, rate / 12 / 100, mode
+
+
+def _growth(r, e):
+    """q^e and (q^e - 1) / r, with the zero-rate limit"""
+    zero = r <= ZERO_RATE
+    growth = (1 + r) ** e
+    with np.errstate(divide='ignore', invalid='ignore'):
+        accrued = np.where(zero, e, (growth - 1) / np.where(zero, 1.0, r))
+    return growth, accrued
+
+
+def event_schedule(loans):
+    """Monthly schedules for a list of loans.
+
+    Returns arrays shaped (loans, months) for payment, interest, principal,
+    fees and closing balance (zero past each loan's term), plus 'proceeds':
+    the cash each borrower receives at origination.
+    """
+    count = len(loans)
+    term = np.array([loan.months for loan in loans], dtype=np.int64)
+    horizon = int(term.max())
+    months = np.arange(1, horizon + 1)
+
+    principal = np.array([loan.principal for loan in loans], dtype=np.float64)
+    proceeds = principal.copy()
+    balloon = np.array([sum(e.amount for e in _events(loan, Balloon)) for loan in loans])
+    fees = np.zeros((count, horizon + 1))
+    for i, loan in enumerate(loans):
+        for fee in _events(loan, Fee):
+            if fee.month == 0 and fee.financed:
+                principal[i] += fee.amount
+            elif fee.month <= loan.months:
+                fees[i, fee.month] += fee.amount
+    proceeds -= fees[:, 0]
+
+    start, end, rate, mode = _compile_portfolio(loans)
+    payment = np.zeros((count, horizon))
+    opening = np.zeros((count, horizon))
+    monthly_rate = np.zeros((count, horizon))
+    balance = principal.copy()
+
+    for k in range(start.shape[1]):
+        s, e, r, m = start[:, k], end[:, k], rate[:, k], mode[:, k]
+        # Re-level the payment so the balance reaches the balloon at maturity
+        annuity, _, _ = _annuity_sums(r, term - s)
+        discount = (1 + r) ** -(term - s).astype(np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            level = np.where(term > s, (balance - balloon * discount) / annuity, 0.0)
+        level = np.where(m == AMORTISING, level, np.where(m == INTEREST_ONLY, balance * r, 0.0))
+
+        elapsed = months[None, :] - 1 - s[:, None]  # months into the segment before this payment
+        active = (elapsed >= 0) & (months[None, :] <= e[:, None])
+        growth, accrued = _growth(r[:, None], np.maximum(elapsed, 0))
+        segment_opening = balance[:, None] * growth - level[:, None] * accrued
+        opening = np.where(active, segment_opening, opening)
+        payment = np.where(active, level[:, None], payment)
+        monthly_rate = np.where(active, r[:, None], monthly_rate)
+
+        growth, accrued = _growth(r, e - s)
+        balance = balance * growth - level * accrued
+
+    interest = opening * monthly_rate
+    principal_paid = payment - interest
+    # The final payment clears whatever is left: the balloon plus float residue
+    last = term - 1
+    rows = np.arange(count)
+    final = opening[rows, last] + interest[rows, last]
+    payment[rows, last] = final
+    principal_paid[rows, last] = opening[rows, last]
+
+    in_term = months[None, :] <= term[:, None]
+    closing = np.where(in_term, opening - principal_paid, 0.0)
+    closing[rows, last] = 0.0
+    return {
+        'month': months,
+        'payment': np.where(in_term, payment, 0.0),
+        'interest': np.where(in_term, interest, 0.0),
+        'principal': np.where(in_term, principal_paid, 0.0),
+        'fees': fees[:, 1:],
+        'balance': closing,
+        'proceeds': proceeds
+    }
+
+
+def effective_rates(schedule, iterations=50, tolerance=1e-12):
+    """APR (nominal, monthly compounding) and EIR (effective annual) per loan, in percent.
+
+    Both solve for the monthly rate that equates the borrower's net
+    proceeds with the present value of all payments and fees.
+    """
+    flows = schedule['payment'] + schedule['fees']
+    proceeds = schedule['proceeds']
+    t = schedule['month'][None, :].astype(np.float64)
+
+    # Start from the rate that makes simple interest match the total charge
+    total = flows.sum(axis=1)
+    weighted_time = (flows * t).sum(axis=1) / np.where(total > 0, total, 1.0)
+    r = np.clip((total / proceeds - 1) / np.maximum(weighted_time, 1.0), 1e-6, 0.5)
+    for _ in range(iterations):
+        discount = (1 + r[:, None]) ** -t
+        value = (flows * discount).sum(axis=1) - proceeds
+        slope = -(flows * t * discount).sum(axis=1) / (1 + r)
+        step = value / slope
+        r = np.maximum(r - step, -0.99)
+        if np.all(np.abs(step) < tolerance):
+            break
+    return {
+        'apr': r * 12 * 100,
+        'eir': ((1 + r) ** 12 - 1) * 100
+    }
+
+
+def portfolio_rates(loans, block_size=2048):
+    """APR, EIR and total cost for a large book, in blocks to bound memory"""
+    results = {'apr': [], 'eir': [], 'total_cost': []}
+    for begin in range(0, len(loans), block_size):
+        schedule = event_schedule(loans[begin:begin + block_size])
+        rates = effective_rates(schedule)
+        results['apr'].append(rates['apr'])
+        results['eir'].append(rates['eir'])
+        results['total_cost'].append(
+            (schedule['payment'] + schedule['fees']).sum(axis=1) - schedule['proceeds']
+        )
+    return {name: np.concatenate(values) for name, values in results.items()}
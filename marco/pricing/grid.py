@@ -0,0 +1,169 @@
+"""Precomputed risk-based pricing grids.
+
+Rates, monthly payment factors and total-cost factors are precomputed over
+(asset class, vehicle age, term, amount band, credit tier) and stored as
+.npy arrays that are memory-mapped on load. A quote is an index lookup on
+every axis plus linear interpolation between amount-band midpoints.
+"""
+import json
+import os
+
+import numpy as np
+
+from marco.pricing.loans import calculate_monthly_payment
+
+DEFAULT_GRID_DIR = os.path.join('data', 'pricing_grid')
+
+# Calculator defaults and limits per asset class, plus the grid's base rate
+ASSET_CLASSES = {
+    "Personal Loan": {
+        'default_amount': 25000.0,
+        'max_amount': 100000.0,
+        'default_rate': 7.5,
+        'max_term': 7,
+        'default_term': 5
+    },
+    "Auto Loan": {
+        'default_amount': 35000.0,
+        'max_amount': 150000.0,
+        'default_rate': 5.5,
+        'max_term': 7,
+        'default_term': 5
+    },
+    "Invoice Finance": {
+        'default_amount': 50000.0,
+        'max_amount': 500000.0,
+        'default_rate': 4.5,
+        'max_term': 1,
+        'default_term': 1
+    }
+}
+
+VEHICLE_AGES = np.arange(0, 11)
+TERMS = np.arange(1, 8)
+# Lower edges of the amount bands; the grid is evaluated at band midpoints
+AMOUNT_BANDS = np.array([1000.0, 5000.0, 10000.0, 25000.0, 50000.0, 100000.0, 250000.0, 500000.0])
+CREDIT_TIERS = ['A', 'B', 'C', 'D', 'E']
+
+# Spreads over the asset-class base rate, in percentage points
+CREDIT_TIER_SPREADS = np.array([-1.0, 0.0, 1.5, 3.5, 6.0])
+VEHICLE_AGE_SPREAD = 0.25  # per year of vehicle age, auto loans only
+TERM_SPREAD = 0.15  # per year beyond the first
+SMALL_LOAN_SPREAD = 2.0  # fades out as the amount grows towards 25k
+
+ARRAYS = ('rate', 'payment_factor', 'total_cost_factor')
+
+
+def amount_midpoints():
+    upper = np.append(AMOUNT_BANDS[1:], AMOUNT_BANDS[-1] * 2)
+    return (AMOUNT_BANDS + upper) / 2
+
+
+def build_grid():
+    """Evaluate the pricing model over every grid point"""
+    classes = list(ASSET_CLASSES)
+    base = np.array([ASSET_CLASSES[name]['default_rate'] for name in classes])
+    is_auto = np.array([name == "Auto Loan" for name in classes])
+    amounts = amount_midpoints()
+
+    # Axes broadcast to (class, age, term, band, tier)
+    rate = (
+        base[:, None, None, None, None]
+        + (is_auto[:, None] * VEHICLE_AGES[None, :] * VEHICLE_AGE_SPREAD)[:, :, None, None, None]
+        + (TERMS - 1)[None, None, :, None, None] * TERM_SPREAD
+        + (SMALL_LOAN_SPREAD * np.clip(1 - amounts / 25000.0, 0.0, 1.0))[None, None, None, :, None]
+        + CREDIT_TIER_SPREADS[None, None, None, None, :]
+    )
+    rate = np.maximum(rate, 0.1)
+
+    terms = np.broadcast_to(TERMS[None, None, :, None, None], rate.shape)
+    payment_factor = calculate_monthly_payment(1.0, rate, terms)
+    total_cost_factor = payment_factor * terms * 12
+
+    return {
+        'axes': {
+            'asset_classes': classes,
+            'vehicle_ages': VEHICLE_AGES.tolist(),
+            'terms': TERMS.tolist(),
+            'amount_midpoints': amounts.tolist(),
+            'credit_tiers': CREDIT_TIERS
+        },
+        'rate': rate.astype(np.float32),
+        'payment_factor': payment_factor.astype(np.float32),
+        'total_cost_factor': total_cost_factor.astype(np.float32)
+    }
+
+
+def save_grid(grid, directory=DEFAULT_GRID_DIR):
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+    for name in ARRAYS:
+        np.save(os.path.join(directory, f"{name}.npy"), grid[name])
+    with open(os.path.join(directory, 'axes.json'), 'w', encoding='utf-8') as f:
+        json.dump(grid['axes'], f)
+
+
+def load_grid(directory=DEFAULT_GRID_DIR, build_if_missing=True):
+    """Memory-map a stored grid, building it first if it does not exist yet"""
+    if not os.path.exists(os.path.join(directory, 'axes.json')):
+        if not build_if_missing:
+            raise FileNotFoundError(f"No pricing grid at {directory}")
+        save_grid(build_grid(), directory)
+
+    with open(os.path.join(directory, 'axes.json'), 'r', encoding='utf-8') as f:
+        axes = json.load(f)
+    grid = {'axes': axes}
+    for name in ARRAYS:
+        grid[name] = np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r')
+    return grid
+
+
+class PricingGrid:
+    """Quotes from a precomputed grid"""
+
+    def __init__(self, grid):
+        axes = grid['axes']
+        self.grid = grid
+        self.class_index = {name: i for i, name in enumerate(axes['asset_classes'])}
+        self.tier_index = {name: i for i, name in enumerate(axes['credit_tiers'])}
+        self.ages = np.asarray(axes['vehicle_ages'])
+        self.terms = np.asarray(axes['terms'])
+        self.amounts = np.asarray(axes['amount_midpoints'])
+
+    @classmethod
+    def load(cls, directory=DEFAULT_GRID_DIR):
+        return cls(load_grid(directory))
+
+    def quote(self, asset_class, amount, term, credit_tier='B', vehicle_age=0):
+        """Rate, monthly payment and total cost for one loan"""
+        if asset_class not in self.class_index:
+            raise ValueError(f"Unknown asset class: {asset_class}")
+        if credit_tier not in self.tier_index:
+            raise ValueError(f"Unknown credit tier: {credit_tier}")
+
+        c = self.class_index[asset_class]
+        a = int(np.clip(vehicle_age, self.ages[0], self.ages[-1])) - int(self.ages[0])
+        t = int(np.clip(term, self.terms[0], self.terms[-1])) - int(self.terms[0])
+        k = self.tier_index[credit_tier]
+
+        # Linear interpolation between the two nearest amount-band midpoints
+        position = np.interp(amount, self.amounts, np.arange(len(self.amounts)))
+        lower = int(np.floor(position))
+        upper = min(lower + 1, len(self.amounts) - 1)
+        weight = position - lower
+
+        def lookup(name):
+            row = self.grid[name][c, a, t, :, k]
+            return float(row[lower] * (1 - weight) + row[upper] * weight)
+
+        return {
+            'rate': lookup('rate'),
+            'monthly_payment': lookup('payment_factor') * amount,
+            'total_cost': lookup('total_cost_factor') * amount
+        }
+
+
+if __name__ == '__main__':
+    # Precompute the grid ahead of deployment: python -m marco.pricing.grid
+    save_grid(build_grid())
+    print(f"Pricing grid written to {DEFAULT_GRID_DIR}")
@@ -0,0 +1,133 @@
+"""Level-payment loan pricing, vectorised over batches of loans.
+
+Every function accepts scalars or equal-length arrays (one entry per loan)
+for principal, annual rate (percent) and term (years).
+"""
+import numpy as np
+
+
+def _loan_arrays(principal, annual_rate, years):
+    principal, annual_rate, years = np.broadcast_arrays(
+        np.asarray(principal, dtype=np.float64),
+        np.asarray(annual_rate, dtype=np.float64),
+        np.asarray(years, dtype=np.int64)
+    )
+    return principal, annual_rate / 12 / 100, years * 12
+
+
+def _scalar_or_array(values):
+    return float(values) if np.ndim(values) == 0 else values
+
+
+def _payment(principal, monthly_rate, num_payments):
+    growth = (1 + monthly_rate) ** num_payments
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(
+            monthly_rate > 0,
+            principal * (monthly_rate * growth) / (growth - 1),
+            principal / num_payments
+        )
+
+
+def calculate_monthly_payment(principal, annual_rate, years):
+    return _scalar_or_array(_payment(*_loan_arrays(principal, annual_rate, years)))
+
+
+def loan_summary(principal, annual_rate, years):
+    """Monthly, annual and total payment and total interest per loan"""
+    monthly_payment = np.asarray(calculate_monthly_payment(principal, annual_rate, years))
+    principal, _, num_payments = _loan_arrays(principal, annual_rate, years)
+    total_payment = monthly_payment * num_payments
+    summary = {
+        'monthly_payment': monthly_payment,
+        'annual_payment': monthly_payment * 12,
+        'total_interest': total_payment - principal,
+        'total_payment': total_payment
+    }
+    return {key: _scalar_or_array(value) for key, value in summary.items()}
+
+
+def monthly_schedule(principal, annual_rate, years):
+    """Closed-form monthly amortization schedules for a batch of loans.
+
+    Returns arrays shaped (loans, months) for interest, principal and the
+    remaining balance, padded with zeros past each loan's term.
+    """
+    principal, monthly_rate, num_payments = _loan_arrays(
+        np.atleast_1d(principal), np.atleast_1d(annual_rate), np.atleast_1d(years)
+    )
+    payment = _payment(principal, monthly_rate, num_payments)
+    months = np.arange(1, int(num_payments.max()) + 1)
+
+    r = monthly_rate[:, None]
+    growth = (1 + r) ** months
+    with np.errstate(divide='ignore', invalid='ignore'):
+        annuity = np.where(r > 0, (growth - 1) / r, months)
+    balance = principal[:, None] * growth - payment[:, None] * annuity
+
+    active = months <= num_payments[:, None]
+    balance = np.where(active, np.maximum(balance, 0.0), 0.0)
+    opening = np.concatenate([principal[:, None], balance[:, :-1]], axis=1)
+    interest = np.where(active, opening * r, 0.0)
+    principal_paid = np.where(active, opening - balance, 0.0)
+
+    return {
+        'month': months,
+        'interest': interest,
+        'principal': principal_paid,
+        'balance': balance
+    }
+
+
+def yearly_schedule(principal, annual_rate, years, monthly_payment=None, exact=False, rounding='half_even'):
+    """Yearly schedule as shown in the calculator pages, as a float64 DataFrame.
+
+    Interest is charged annually on the opening balance and twelve monthly
+    payments are applied per year. With exact=True the schedule is instead
+    the monthly integer-cents schedule (see marco.pricing.cents) summed by
+    year, which reconciles to the cent and ends at a zero balance.
+    """
+    import pandas as pd
+
+    if exact:
+        from marco.pricing.cents import cents_schedule, from_cents
+
+        cents = cents_schedule(principal, annual_rate, years, rounding, monthly_payment)
+        by_year = (1, years, 12)
+        return pd.DataFrame({
+            "Year": np.arange(1, years + 1, dtype=np.int64),
+            "Remaining Balance": from_cents(cents['balance'][0, 11::12]),
+            "Interest Paid": from_cents(cents['interest'].reshape(by_year).sum(axis=2)[0]),
+            "Principal Paid": from_cents(cents['principal'].reshape(by_year).sum(axis=2)[0])
+        })
+
+    if monthly_payment is None:
+        monthly_payment = calculate_monthly_payment(principal, annual_rate, years)
+
+    remaining_balance = np.empty(years)
+    interest_paid = np.empty(years)
+    principal_paid = np.empty(years)
+
+    balance = principal
+    yearly_payment = monthly_payment * 12
+    for i in range(years):
+        yearly_interest = balance * (annual_rate / 100)
+        yearly_principal = yearly_payment - yearly_interest
+        balance = max(0, balance - yearly_principal)
+
+        remaining_balance[i] = balance
+        interest_paid[i] = yearly_interest
+        principal_paid[i] = yearly_principal
+
+    return pd.DataFrame({
+        "Year": np.arange(1, years + 1, dtype=np.int64),
+        "Remaining Balance": remaining_balance,
+        "Interest Paid": interest_paid,
+        "Principal Paid": principal_paid
+    })
+
+
+def price_loans(principal, annual_rate, years):
+    """Summary metrics for a batch of loans, as lists ready for JSON"""
+    summary = loan_summary(np.atleast_1d(principal), np.atleast_1d(annual_rate), np.atleast_1d(years))
+    return {key: np.atleast_1d(value).tolist() for key, value in summary.items()}
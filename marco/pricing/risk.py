@@ -0,0 +1,155 @@
+"""Closed-form risk measures for level-payment loans and pools.
+
+Yield, WAL, Macaulay and modified duration, convexity and DV01 come from
+closed-form annuity sums, so a book of a million loans is a handful of
+array operations with no cash-flow matrices and no bump-and-reprice loops.
+Inputs are scalars or equal-length arrays per loan: outstanding principal,
+annual coupon (percent) and remaining term in months.
+"""
+import numpy as np
+
+# Periodic yields this close to zero are treated as zero to avoid cancellation in the annuity sums
+ZERO_RATE = 1e-9
+
+
+def _arrays(principal, annual_rate, months):
+    principal, annual_rate, months = np.broadcast_arrays(
+        np.asarray(principal, dtype=np.float64),
+        np.asarray(annual_rate, dtype=np.float64),
+        np.asarray(months, dtype=np.float64)
+    )
+    return principal, annual_rate / 12 / 100, months
+
+
+def _level_payment(principal, rate, n):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(rate > ZERO_RATE, principal * rate / (1 - (1 + rate) ** -n), principal / n)
+
+
+def _annuity_sums(y, n):
+    """Sum over t = 1..n of v^t, t v^t and t^2 v^t with v = 1 / (1 + y)"""
+    zero = np.abs(y) <= ZERO_RATE
+    y = np.where(zero, 1.0, y)  # placeholder, replaced below
+    v = 1 / (1 + y)
+    vn = v ** n
+    one_minus_v = 1 - v
+
+    s0 = (1 - vn) / y
+    s1 = v * (1 - (n + 1) * vn + n * vn * v) / one_minus_v ** 2
+    s2 = v * (
+        1 + v - (n + 1) ** 2 * vn + (2 * n ** 2 + 2 * n - 1) * vn * v - n ** 2 * vn * v ** 2
+    ) / one_minus_v ** 3
+
+    s0 = np.where(zero, n, s0)
+    s1 = np.where(zero, n * (n + 1) / 2, s1)
+    s2 = np.where(zero, n * (n + 1) * (2 * n + 1) / 6, s2)
+    return s0, s1, s2
+
+
+def price_from_yield(principal, annual_rate, months, annual_yield):
+    """Present value of the remaining level payments at an annual yield (percent)"""
+    principal, rate, n = _arrays(principal, annual_rate, months)
+    payment = _level_payment(principal, rate, n)
+    s0, _, _ = _annuity_sums(np.asarray(annual_yield, dtype=np.float64) / 12 / 100, n)
+    return payment * s0
+
+
+def yield_from_price(principal, annual_rate, months, price, iterations=50, tolerance=1e-12):
+    """Annual yield (percent) implied by a price, by vectorised Newton on the closed-form PV"""
+    principal, rate, n = _arrays(principal, annual_rate, months)
+    payment = _level_payment(principal, rate, n)
+    price = np.broadcast_to(np.asarray(price, dtype=np.float64), principal.shape)
+
+    y = np.maximum(rate, 1e-6)
+    for _ in range(iterations):
+        s0, s1, _ = _annuity_sums(y, n)
+        value = payment * s0 - price
+        # dPV/dy = -sum t M v^(t+1)
+        slope = -payment * s1 / (1 + y)
+        step = value / slope
+        y = np.maximum(y - step, -0.99)
+        if np.all(np.abs(step) < tolerance):
+            break
+    return y * 12 * 100
+
+
+def weighted_average_life(principal, annual_rate, months):
+    """Principal-weighted average life in years"""
+    principal, rate, n = _arrays(principal, annual_rate, months)
+
+    # Principal paid in month t is proportional to q^(t-1) with q = 1 + rate.
+    # Written in v^n = q^-n, which underflows harmlessly, instead of the first
+    # principal payment, which cancels to zero at high rates and long terms
+    q = 1 + rate
+    zero = rate <= ZERO_RATE
+    safe_rate = np.where(zero, 1.0, rate)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        vn = q ** -n
+        months_weighted = np.where(
+            zero,
+            (n + 1) / 2,
+            (vn - (n + 1) + n * q) / (safe_rate * (1 - vn))
+        )
+        return np.where(principal > 0, months_weighted, 0.0) / 12
+
+
+def risk_measures(principal, annual_rate, months, annual_yield=None, price=None):
+    """Yield, price, WAL, durations, convexity and DV01 per loan.
+
+    The discount yield is annual_yield if given, else the yield implied by
+    price if given, else the loan's own coupon (pricing at par).
+    Durations are in years, convexity in years squared, DV01 in currency
+    per basis point.
+    """
+    principal, rate, n = _arrays(principal, annual_rate, months)
+    if annual_yield is not None:
+        y = np.broadcast_to(np.asarray(annual_yield, dtype=np.float64), principal.shape) / 12 / 100
+    elif price is not None:
+        y = yield_from_price(principal, rate * 12 * 100, n, price) / 12 / 100
+    else:
+        y = rate
+
+    payment = _level_payment(principal, rate, n)
+    s0, s1, s2 = _annuity_sums(y, n)
+    value = payment * s0
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        macaulay = np.where(value > 0, payment * s1 / value, 0.0)  # periods
+        # sum t (t + 1) v^(t + 2) = (s2 + s1) / (1 + y)^2
+        convexity = np.where(value > 0, payment * (s2 + s1) / (1 + y) ** 2 / value, 0.0)
+    modified = macaulay / (1 + y)
+
+    return {
+        'yield': y * 12 * 100,
+        'price': value,
+        'wal': weighted_average_life(principal, rate * 12 * 100, n),
+        'macaulay_duration': macaulay / 12,
+        'modified_duration': modified / 12,
+        'convexity': convexity / 144,
+        'dv01': modified / 12 * value * 0.0001
+    }
+
+
+def pool_risk(measures, principal):
+    """Aggregate per-loan measures to the pool.
+
+    Durations and convexity are value-weighted, WAL is principal-weighted,
+    DV01 and price add up. Averages over a pool with no principal or no value
+    are None.
+    """
+    value = measures['price']
+    principal = np.asarray(principal, dtype=np.float64)
+    total_value = value.sum()
+    total_principal = principal.sum()
+
+    def value_weighted(name):
+        return float((measures[name] * value).sum() / total_value) if total_value > 0 else None
+
+    return {
+        'price': float(total_value),
+        'wal': float((measures['wal'] * principal).sum() / total_principal) if total_principal > 0 else None,
+        'macaulay_duration': value_weighted('macaulay_duration'),
+        'modified_duration': value_weighted('modified_duration'),
+        'convexity': value_weighted('convexity'),
+        'dv01': float(measures['dv01'].sum())
+    }
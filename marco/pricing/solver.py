@@ -0,0 +1,103 @@
+"""Inverse loan calculations, batched over arrays of queries.
+
+The forward relation is payment = principal / a(n, r), where a is the
+annuity factor for n monthly payments at monthly rate r. Principal and term
+have closed forms; the rate does not and is found with a vectorised Newton
+iteration safeguarded by bisection. Queries that have no solution (for
+example a payment that never covers the interest, or a rate above
+MAX_MONTHLY_RATE) come back as NaN.
+"""
+import numpy as np
+
+from marco.pricing.risk import ZERO_RATE, _annuity_sums
+
+MAX_MONTHLY_RATE = 1.0  # 1200% a year bounds the rate search
+
+
+def max_principal(payment, annual_rate, years):
+    """Largest principal an affordable monthly payment can service"""
+    payment, annual_rate, years = np.broadcast_arrays(
+        np.asarray(payment, dtype=np.float64),
+        np.asarray(annual_rate, dtype=np.float64),
+        np.asarray(years, dtype=np.float64)
+    )
+    annuity, _, _ = _annuity_sums(annual_rate / 12 / 100, years * 12)
+    return payment * annuity
+
+
+def term_for_payment(principal, annual_rate, payment):
+    """Months needed to repay principal with a given payment (fractional; NaN if never repaid)"""
+    principal, annual_rate, payment = np.broadcast_arrays(
+        np.asarray(principal, dtype=np.float64),
+        np.asarray(annual_rate, dtype=np.float64),
+        np.asarray(payment, dtype=np.float64)
+    )
+    rate = annual_rate / 12 / 100
+    zero = rate <= ZERO_RATE
+    with np.errstate(divide='ignore', invalid='ignore'):
+        coverage = 1 - np.where(zero, 0.0, rate) * principal / payment
+        months = np.where(
+            zero,
+            principal / payment,
+            -np.log(coverage) / np.log1p(np.where(zero, 1.0, rate))
+        )
+    return np.where((payment > 0) & (zero | (coverage > 0)), months, np.nan)
+
+
+def rate_for_payment(principal, payment, years, fees=0.0, iterations=100, tolerance=1e-12):
+    """Annual rate (percent) implied by a quoted payment.
+
+    With fees, the borrower receives principal - fees but repays the quoted
+    payment, so the result is the APR including fees.
+    """
+    principal, payment, years, fees = np.broadcast_arrays(
+        np.asarray(principal, dtype=np.float64),
+        np.asarray(payment, dtype=np.float64),
+        np.asarray(years, dtype=np.float64),
+        np.asarray(fees, dtype=np.float64)
+    )
+    n = years * 12
+    proceeds = principal - fees
+
+    # f(r) = payment * a(n, r) - proceeds is decreasing in r
+    lo = np.zeros(principal.shape)
+    hi = np.full(principal.shape, MAX_MONTHLY_RATE)
+    feasible = (payment * n >= proceeds) & (proceeds > 0) & (payment > 0)
+    # A root above the search bound would collapse onto hi and look like a solution
+    annuity_at_hi, _, _ = _annuity_sums(hi, n)
+    feasible &= payment * annuity_at_hi <= proceeds
+
+    # Start from the rate at which interest alone equals the payment, scaled down
+    r = np.clip(payment / np.where(proceeds > 0, proceeds, 1.0) - 1 / n, 1e-6, MAX_MONTHLY_RATE / 2)
+    for _ in range(iterations):
+        annuity, weighted, _ = _annuity_sums(r, n)
+        value = payment * annuity - proceeds
+        slope = -payment * weighted / (1 + r)
+
+        lo = np.where(value > 0, r, lo)
+        hi = np.where(value > 0, hi, r)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            newton = r - value / slope
+        # Fall back to bisection when Newton leaves the bracket
+        outside = ~np.isfinite(newton) | (newton <= lo) | (newton >= hi)
+        next_r = np.where(outside, (lo + hi) / 2, newton)
+        converged = np.abs(next_r - r) < tolerance
+        r = next_r
+        if np.all(converged | ~feasible):
+            break
+
+    # A payment of exactly principal / n means zero interest
+    r = np.where(payment * n == proceeds, 0.0, r)
+    return np.where(feasible, r * 12 * 100, np.nan)
+
+
+def affordability_sweep(payments, annual_rates, terms):
+    """Maximum principal for every (payment, rate, term) combination.
+
+    Returns an array shaped (len(payments), len(annual_rates), len(terms)).
+    """
+    payments = np.asarray(payments, dtype=np.float64)[:, None, None]
+    annual_rates = np.asarray(annual_rates, dtype=np.float64)[None, :, None]
+    terms = np.asarray(terms, dtype=np.float64)[None, None, :]
+    return max_principal(payments, annual_rates, terms)
@@ -1,18 +1,45 @@
 import streamlit as st
 from ai.analysis_agent import CompanyAnalysisAgent
+from ai.incremental import SnapshotStore
+from ai.semantic_cache import SemanticCache
+from utils.record_store import RecordStore
+from utils.session_store import SessionResources
+from utils.tracing import performance_panel, session_sampling, tracer
 import os
-from datetime import datetime
+import uuid
 
 st.title('Onboarding Agent')
 st.subheader('Document Analysis Assistant')
 
-# Initialize session state
-if 'extracted_data' not in st.session_state:
-    st.session_state.extracted_data = None
+@st.cache_resource
+def get_semantic_cache():
+    """Near-duplicate document cache shared by all sessions"""
+    return SemanticCache(path=os.path.join('data', 'semantic_cache.pkl'))
+
+@st.cache_resource
+def get_record_store():
+    """Versioned record store shared by all sessions"""
+    return RecordStore()
+
+@st.cache_resource
+def get_session_resources():
+    """Uploads and results for all sessions, within a shared memory budget"""
+    return SessionResources()
+
+resources = get_session_resources()
+resources.expire()
+
+# Initialize session state. Only small handles live here; file bytes and
+# results are held by the session resource store.
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
 if 'uploaded_file' not in st.session_state:
     st.session_state.uploaded_file = None
+if 'upload_key' not in st.session_state:
+    st.session_state.upload_key = None
 if 'analysis_complete' not in st.session_state:
     st.session_state.analysis_complete = False
+resources.touch(st.session_state.session_id)
 
 # Add model selection to sidebar
 with st.sidebar:
@@ -22,6 +49,23 @@ with st.sidebar:
         options=["gpt-4o", "gpt-4o-mini"],
         help="Choose the OpenAI model to use for analysis"
     )
+    
+    cache_stats = get_semantic_cache().stats
+    st.caption(
+        f"Document cache: {cache_stats['exact_hits'] + cache_stats['near_hits']} hits, "
+        f"{cache_stats['misses']} misses"
+    )
+    
+    gauges = resources.gauges(st.session_state.session_id)
+    st.progress(
+        min(1.0, gauges['memory_bytes'] / gauges['memory_limit']),
+        text=f"Server memory: {gauges['memory_bytes'] / 1024 ** 2:.1f} of "
+             f"{gauges['memory_limit'] / 1024 ** 2:.0f} MB across {gauges['sessions']} session(s)"
+    )
+    st.caption(
+        f"This session: {gauges['session']['memory_bytes'] / 1024:.0f} KB in memory, "
+        f"{gauges['session']['disk_bytes'] / 1024:.0f} KB on disk"
+    )
 
 # File upload section with drag and drop
 uploaded_file = st.file_uploader(
@@ -31,8 +75,11 @@ uploaded_file = st.file_uploader(
 )
 
 # Display file details if uploaded
-if uploaded_file and uploaded_file != st.session_state.uploaded_file:
-    st.session_state.uploaded_file = uploaded_file
+# Re-store the upload if it is new or its stored copy has expired
+if uploaded_file and ((uploaded_file.name, uploaded_file.size) != st.session_state.upload_key
+                      or not resources.contains(st.session_state.session_id, 'upload')):
+    st.session_state.upload_key = (uploaded_file.name, uploaded_file.size)
+    st.session_state.uploaded_file = resources.put_upload(st.session_state.session_id, uploaded_file)
     st.session_state.analysis_complete = False
     
     # Show file details
@@ -53,11 +100,39 @@ if st.session_state.uploaded_file and not st.session_state.analysis_complete:
             try:
                 # Pass the uploaded file directly instead of saving it
                 analysis_agent = CompanyAnalysisAgent(model_name=model_name)
-                extracted_data = analysis_agent.analyze_document(st.session_state.uploaded_file)
+                with tracer.trace("onboarding_analysis", sampling=session_sampling("onboarding_analysis")):
+                    extracted_data, debug_info = analysis_agent.analyze_document(
+                        st.session_state.uploaded_file,
+                        snapshot_store=SnapshotStore(),
+                        semantic_cache=get_semantic_cache()
+                    )
                 
-                st.session_state.extracted_data = extracted_data
+                resources.put(st.session_state.session_id, 'extracted_data', extracted_data)
                 st.session_state.analysis_complete = True
                 st.success('Document analyzed successfully!')
+                # Stored records feed the Portfolio Analytics page
+                try:
+                    get_record_store().save(extracted_data)
+                except ValueError:
+                    st.warning("No company name was found, so this record was not added to the portfolio")
+                
+                similarity = debug_info.get('semantic_cache', {}).get('similarity')
+                if similarity is not None:
+                    st.info(f"Matched an earlier document ({similarity:.0%} similar); reused its analysis")
+                
+                if 'incremental' in debug_info:
+                    incremental = debug_info['incremental']
+                    st.info(
+                        f"Revised document: {incremental['added_chunks']} of {incremental['total_chunks']} chunks changed, "
+                        f"re-extracted {len(incremental['reextracted_sections'])} section(s)"
+                    )
+                
+                issues = debug_info['typed_fields'].issues
+                if issues:
+                    st.warning(
+                        "Could not read a typed value for: "
+                        + ", ".join(f"{name} ('{raw}')" for name, raw in issues)
+                    )
                 
                 # Display analysis results
                 st.subheader("Analysis Results")
@@ -68,5 +143,12 @@ if st.session_state.uploaded_file and not st.session_state.analysis_complete:
 
 # Show previous analysis results
 elif st.session_state.analysis_complete:
-    st.subheader("Previous Analysis Results")
-    st.json(st.session_state.extracted_data) 
\ No newline at end of file
+    extracted_data = resources.get(st.session_state.session_id, 'extracted_data')
+    if extracted_data is None:
+        st.session_state.analysis_complete = False
+        st.info("Previous results expired after a period of inactivity. Analyze the document again to restore them.")
+    else:
+        st.subheader("Previous Analysis Results")
+        st.json(extracted_data) 
+
+performance_panel("onboarding_analysis", title="Analysis Performance")
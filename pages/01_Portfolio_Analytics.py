@@ -0,0 +1,138 @@
+import streamlit as st
+from utils.portfolio import GROUP_COLUMNS, PortfolioAnalytics
+from utils.record_store import RecordStore
+
+st.title("Portfolio Analytics")
+st.subheader("Onboarded companies across all documents")
+
+@st.cache_resource
+def get_portfolio():
+    """Columnar table of the latest record per company, shared by all sessions"""
+    return PortfolioAnalytics(RecordStore())
+
+portfolio = get_portfolio()
+
+# New records are picked up incrementally on every rerun
+added = portfolio.refresh()
+if added:
+    st.toast(f"Loaded {added} new or updated record(s)")
+
+if portfolio.table is None or portfolio.table.num_rows == 0:
+    st.info("No onboarded companies yet. Analyze documents on the Onboarding page to populate the portfolio.")
+    st.stop()
+
+import pyarrow.compute as pc
+
+table = portfolio.table
+
+def distinct(column):
+    return sorted(value for value in table[column].unique().to_pylist() if value)
+
+# Offering sizes are in each company's own currency; sizes are only compared
+# and added up within one currency
+currencies = distinct('currency')
+
+# Filters
+with st.sidebar:
+    st.header("Filters")
+    jurisdictions = st.multiselect("Jurisdiction", distinct('jurisdiction'))
+    exchanges = st.multiselect("Stock Exchange", distinct('stock_exchange'))
+    offering_currency = st.selectbox(
+        "Offering Currency",
+        currencies,
+        help="Currency of the offering size filter and the headline total"
+    ) if currencies else None
+    largest_offering = 1.0
+    if offering_currency:
+        in_currency = table.filter(pc.equal(table['currency'], offering_currency))
+        largest_offering = max(1.0, (pc.max(in_currency['offering_size']).as_py() or 0.0) / 1e6)
+    min_offering, max_offering = st.slider(
+        f"Offering Size ({offering_currency or 'currency'} millions)",
+        min_value=0.0,
+        max_value=largest_offering,
+        value=(0.0, largest_offering),
+        disabled=offering_currency is None,
+        help="Maximum shares times price per share; narrowing keeps only companies in the offering currency"
+    )
+    use_window = st.checkbox("Filter by offering window")
+    if use_window:
+        window = st.date_input("Offering open between", value=())
+    group_column = st.selectbox(
+        "Group By",
+        GROUP_COLUMNS,
+        format_func=lambda column: column.replace('_', ' ').title()
+    )
+
+offering_limits = {}
+if min_offering > 0:
+    offering_limits['min_offering'] = min_offering * 1e6
+if max_offering < largest_offering:
+    offering_limits['max_offering'] = max_offering * 1e6
+if offering_limits:
+    offering_limits['currency'] = offering_currency
+if use_window and len(window) == 2:
+    offering_limits['offering_from'], offering_limits['offering_to'] = window
+
+filtered = portfolio.filter(
+    jurisdiction=jurisdictions,
+    stock_exchange=exchanges,
+    **offering_limits
+)
+
+# Headline metrics
+col1, col2, col3 = st.columns(3)
+with col1:
+    st.metric("Companies", f"{filtered.num_rows:,}", delta=f"of {table.num_rows:,}", delta_color="off")
+with col2:
+    if offering_currency:
+        currency_rows = filtered.filter(pc.equal(filtered['currency'], offering_currency))
+        st.metric(f"Total Offering ({offering_currency})",
+                  f"{pc.sum(currency_rows['offering_size']).as_py() or 0.0:,.0f}")
+    else:
+        st.metric("Total Offering", "n/a", help="No offering has a recognised currency")
+with col3:
+    unparsed = pc.sum(pc.greater(filtered['issue_count'], 0)).as_py() or 0
+    st.metric("Records With Unparsed Fields", f"{unparsed:,}")
+
+# Aggregates
+st.header(f"By {group_column.replace('_', ' ').title()}")
+groups = portfolio.group_by(group_column, filtered).to_pandas()
+groups[group_column] = groups[group_column].fillna("Unknown")
+groups["currency"] = groups["currency"].fillna("Unknown")
+st.bar_chart(groups.groupby(group_column)["companies"].sum())
+
+# Amounts are in the currency shown on each row
+money_column = st.column_config.NumberColumn(format="%.2f")
+st.dataframe(
+    groups,
+    hide_index=True,
+    column_config={
+        "currency": st.column_config.TextColumn("Currency"),
+        "companies": st.column_config.NumberColumn("Companies", format="%d"),
+        "total_offering": st.column_config.NumberColumn("Total Offering", format="%.0f"),
+        "median_offering": st.column_config.NumberColumn("Median Offering", format="%.0f"),
+        "mean_price_per_share": money_column
+    }
+)
+
+# Company list; only the first rows are sent to the browser
+st.header("Companies")
+preview_columns = [
+    'company_name', 'jurisdiction', 'stock_exchange', 'offering_start', 'offering_end',
+    'maximum_shares', 'price_per_share', 'currency', 'offering_size'
+]
+st.dataframe(
+    filtered.select(preview_columns).slice(0, 1000).to_pandas(),
+    hide_index=True,
+    column_config={
+        "price_per_share": money_column,
+        "offering_size": st.column_config.NumberColumn(format="%.0f")
+    }
+)
+if filtered.num_rows > 1000:
+    st.caption(f"Showing the first 1,000 of {filtered.num_rows:,} companies")
+
+st.sidebar.caption(
+    f"Table refreshed {portfolio.stats['refreshes']} time(s); "
+    f"last refresh took {portfolio.stats['last_refresh_seconds'] * 1000:.0f} ms"
+)
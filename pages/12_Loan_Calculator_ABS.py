@@ -1,19 +1,33 @@
 import streamlit as st
-import numpy as np
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+from marco.pricing import (
+    ASSET_CLASSES,
+    CREDIT_TIERS,
+    Balloon,
+    Fee,
+    Loan,
+    PaymentHoliday,
+    PricingGrid,
+    RateReset,
+    effective_rates,
+    event_schedule,
+    loan_summary,
+    max_principal,
+    rate_for_payment,
+    risk_measures,
+    term_for_payment,
+    yearly_schedule,
+)
+from utils.tracing import performance_panel, session_sampling, span, tracer
 
-def calculate_monthly_payment(principal, annual_rate, years):
-    monthly_rate = annual_rate / 12 / 100
-    num_payments = years * 12
-    return principal * (monthly_rate * (1 + monthly_rate)**num_payments) / ((1 + monthly_rate)**num_payments - 1)
+# Every rerun is traced; stages below are timed as child spans
+run = tracer.begin("abs_page", sampling=session_sampling("abs_page"))
 
 st.title("Asset-Backed Securities Loan Calculator")
 
 # Asset class selection
 asset_class = st.sidebar.selectbox(
     "Asset Class",
-    ["Personal Loan", "Auto Loan", "Invoice Finance"],
+    list(ASSET_CLASSES),
     index=0
 )
 
@@ -21,24 +35,12 @@ asset_class = st.sidebar.selectbox(
 st.sidebar.header("Loan Parameters")
 
 # Set default values and limits based on asset class
-if asset_class == "Personal Loan":
-    default_amount = 25000.0
-    max_amount = 100000.0
-    default_rate = 7.5
-    max_term = 7
-    default_term = 5
-elif asset_class == "Auto Loan":
-    default_amount = 35000.0
-    max_amount = 150000.0
-    default_rate = 5.5
-    max_term = 7
-    default_term = 5
-else:  # Invoice Finance
-    default_amount = 50000.0
-    max_amount = 500000.0
-    default_rate = 4.5
-    max_term = 1
-    default_term = 1
+defaults = ASSET_CLASSES[asset_class]
+default_amount = defaults['default_amount']
+max_amount = defaults['max_amount']
+default_rate = defaults['default_rate']
+max_term = defaults['max_term']
+default_term = defaults['default_term']
 
 loan_amount = st.sidebar.number_input(
     "Loan Amount (€)", 
@@ -94,12 +96,140 @@ elif asset_class == "Invoice Finance":
         value=80
     )
 
+# Risk-based pricing from the precomputed grid
+@st.cache_resource
+def get_pricing_grid():
+    """Pricing grid memory-mapped once per server"""
+    return PricingGrid.load()
+
+credit_tier = st.sidebar.selectbox(
+    "Credit Tier",
+    CREDIT_TIERS,
+    index=1,
+    help="A is the strongest borrower profile, E the weakest"
+)
+with span("grid_quote"):
+    grid_quote = get_pricing_grid().quote(
+        asset_class,
+        loan_amount,
+        loan_term,
+        credit_tier=credit_tier,
+        vehicle_age=vehicle_age if asset_class == "Auto Loan" and vehicle_type == "Used" else 0
+    )
+use_grid_rate = st.sidebar.checkbox(
+    f"Use risk-based rate ({grid_quote['rate']:.2f}%)",
+    value=False
+)
+if use_grid_rate:
+    interest_rate = grid_quote['rate']
+
 # Add recalculate button
 if st.sidebar.button("Recalculate"):
     st.rerun()
 
+# Update disclaimer based on asset class
+if asset_class == "Personal Loan":
+    disclaimer = """
+    This calculator provides estimates for personal loans. 
+    Actual loan terms and rates may vary based on factors such as credit score, 
+    income, debt-to-income ratio, and lender requirements.
+    """
+elif asset_class == "Auto Loan":
+    disclaimer = """
+    This calculator provides estimates for auto loans. 
+    Final terms depend on factors including credit score, vehicle age, 
+    down payment, and lender requirements. Additional costs like insurance
+    are not included in these calculations.
+    """
+else:
+    disclaimer = """
+    This calculator provides estimates for invoice finance facilities. 
+    Actual terms depend on factors such as customer creditworthiness,
+    invoice quality, and business track record. Additional fees may apply.
+    """
+
+# Invoice finance is priced as an advance against receivables rather than
+# an amortizing loan
+if asset_class == "Invoice Finance":
+    from marco.invoice import generate_portfolio, invoice_quote, project_facility
+
+    quote = invoice_quote(loan_amount, payment_terms, advance_rate, interest_rate)
+
+    st.header("Invoice Advance Summary")
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.metric("Advance", f"€{quote['advance']:,.2f}")
+        st.metric("Discount Fee", f"€{quote['fee']:,.2f}")
+
+    with col2:
+        st.metric("Rebate on Collection", f"€{quote['rebate']:,.2f}")
+        st.metric("Fee as Annual Rate on Face Value", f"{quote['effective_rate']:.2f}%")
+
+    st.header("Revolving Facility Projection")
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        invoices_per_month = st.number_input("Invoices per Month", min_value=1, max_value=10000, value=20, step=1)
+    with col2:
+        facility_limit = st.number_input(
+            "Facility Limit (€)",
+            min_value=10000.0,
+            value=float(loan_amount * advance_rate / 100 * invoices_per_month * 3),
+            step=10000.0
+        )
+    with col3:
+        days_late = st.number_input("Average Days Late", min_value=0, max_value=180, value=5, step=1)
+    with col4:
+        dilution = st.number_input("Dilution (%)", min_value=0.0, max_value=50.0, value=1.0, step=0.5)
+
+    @st.cache_data(show_spinner=False)
+    def project_invoices(average_amount, payment_terms, advance_rate, annual_rate, invoices_per_month,
+                         horizon_days, facility_limit, days_late, dilution):
+        portfolio = generate_portfolio(
+            invoices_per_month * 12 * horizon_days // 365, average_amount, horizon_days,
+            payment_terms, days_late=days_late
+        )
+        return project_facility(
+            portfolio['amount'], portfolio['issue_day'], portfolio['collection_day'],
+            advance_rate, annual_rate, limit=facility_limit, dilution=dilution,
+            defaulted=portfolio['defaulted'], horizon=horizon_days
+        )
+
+    with span("project_facility"):
+        projection = project_invoices(
+            loan_amount, payment_terms, advance_rate, interest_rate, invoices_per_month,
+            365 * loan_term, facility_limit, days_late, dilution
+        )
+    summary = projection.summary
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Total Advanced", f"€{summary['total_advanced']:,.2f}")
+        st.metric("Total Fees", f"€{summary['total_fees']:,.2f}")
+    with col2:
+        st.metric("Average Outstanding", f"€{summary['average_outstanding']:,.2f}")
+        st.metric("Peak Utilisation", f"{summary['peak_utilisation']:.1f}%")
+    with col3:
+        st.metric("Fee Yield on Outstanding", f"{summary['fee_yield']:.2f}%")
+        st.metric("Invoices Not Funded", f"{summary['unfunded_invoices']:,} of {summary['invoices']:,}")
+
+    import pandas as pd
+
+    st.caption("Advances outstanding by day (€)")
+    st.line_chart(pd.DataFrame({
+        "Outstanding": projection.outstanding,
+        "Facility Limit": facility_limit
+    }, index=projection.days))
+
+    st.caption(disclaimer)
+    run.finish()
+    performance_panel("abs_page")
+    st.stop()
+
 # Calculate monthly payment
-monthly_payment = calculate_monthly_payment(loan_amount, interest_rate, loan_term)
+with span("loan_summary"):
+    summary = loan_summary(loan_amount, interest_rate, loan_term)
+monthly_payment = summary['monthly_payment']
 
 # Display results
 st.header("Loan Summary")
@@ -107,118 +237,304 @@ col1, col2 = st.columns(2)
 
 with col1:
     st.metric("Monthly Payment", f"€{monthly_payment:,.2f}")
-    st.metric("Annual Payment", f"€{monthly_payment * 12:,.2f}")
+    st.metric("Annual Payment", f"€{summary['annual_payment']:,.2f}")
 
 with col2:
-    st.metric("Total Interest", f"€{(monthly_payment * 12 * loan_term - loan_amount):,.2f}")
-    st.metric("Total Payment", f"€{monthly_payment * 12 * loan_term:,.2f}")
+    st.metric("Total Interest", f"€{summary['total_interest']:,.2f}")
+    st.metric("Total Payment", f"€{summary['total_payment']:,.2f}")
 
-# Additional information
-st.header("Amortization Schedule")
-years = list(range(1, loan_term + 1))
-remaining_balance = []
-interest_paid = []
-principal_paid = []
-
-balance = loan_amount
-for year in years:
-    yearly_payment = monthly_payment * 12
-    yearly_interest = balance * (interest_rate / 100)
-    yearly_principal = yearly_payment - yearly_interest
-    balance = max(0, balance - yearly_principal)
-    
-    remaining_balance.append(balance)
-    interest_paid.append(yearly_interest)
-    principal_paid.append(yearly_principal)
-
-# Create payment visualization
-fig = make_subplots(specs=[[{"secondary_y": True}]])
-
-# Add area traces for principal and interest
-fig.add_trace(
-    go.Scatter(
-        x=years,
-        y=principal_paid,
-        name="Principal",
-        fill='tonexty',
-        mode='lines',
-        line=dict(width=0.5, color='rgb(73, 163, 156)'),
-        stackgroup='one'
+with st.expander("Risk Measures"):
+    discount_yield = st.number_input(
+        "Discount Yield (%)",
+        min_value=0.0,
+        max_value=50.0,
+        value=float(interest_rate),
+        step=0.1,
+        help="Yield used to value the remaining payments; equal to the loan rate prices it at par"
     )
-)
+    with span("risk_measures"):
+        risk = risk_measures(loan_amount, interest_rate, loan_term * 12, annual_yield=discount_yield)
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Price", f"€{float(risk['price']):,.2f}")
+        st.metric("WAL", f"{float(risk['wal']):.2f} years")
+    with col2:
+        st.metric("Macaulay Duration", f"{float(risk['macaulay_duration']):.2f} years")
+        st.metric("Modified Duration", f"{float(risk['modified_duration']):.2f}")
+    with col3:
+        st.metric("Convexity", f"{float(risk['convexity']):.2f}")
+        st.metric("DV01", f"€{float(risk['dv01']):,.2f}")
 
-fig.add_trace(
-    go.Scatter(
-        x=years,
-        y=interest_paid,
-        name="Interest",
-        fill='tonexty',
-        mode='lines',
-        line=dict(width=0.5, color='rgb(255, 144, 144)'),
-        stackgroup='one'
+with st.expander("Solve for Payment Target"):
+    solve_for = st.radio("Solve for", ["Loan Amount", "Term", "Rate (APR)"], horizontal=True)
+    target_payment = st.number_input(
+        "Target Monthly Payment (€)",
+        min_value=1.0,
+        value=float(round(monthly_payment, 2)),
+        step=10.0
     )
+    if solve_for == "Loan Amount":
+        amount = float(max_principal(target_payment, interest_rate, loan_term))
+        st.metric("Maximum Loan Amount", f"€{amount:,.2f}")
+    elif solve_for == "Term":
+        months = float(term_for_payment(loan_amount, interest_rate, target_payment))
+        if months != months:
+            st.warning("The payment does not cover the monthly interest, so the loan is never repaid.")
+        else:
+            st.metric("Term Needed", f"{months:.1f} months ({months / 12:.1f} years)")
+    else:
+        fees = st.number_input("Upfront Fees (€)", min_value=0.0, value=0.0, step=50.0)
+        apr = float(rate_for_payment(loan_amount, target_payment, loan_term, fees=fees))
+        if apr != apr:
+            st.warning("No rate matches this payment: it does not repay the amount financed.")
+        else:
+            st.metric("Implied APR", f"{apr:.3f}%")
+
+with st.expander("Fees, Balloon, Holidays and Rate Resets"):
+    col1, col2 = st.columns(2)
+    with col1:
+        upfront_fee = st.number_input("Origination Fee (€)", min_value=0.0, value=0.0, step=50.0)
+        fee_financed = st.checkbox("Finance the fee", help="Add the fee to the loan balance instead of paying it upfront")
+        monthly_fee = st.number_input("Monthly Account Fee (€)", min_value=0.0, value=0.0, step=1.0)
+        balloon_amount = st.number_input(
+            "Balloon Payment (€)", min_value=0.0, max_value=float(loan_amount), value=0.0, step=500.0
+        )
+    with col2:
+        holiday_start = st.number_input("Payment Holiday From Month", min_value=0, max_value=loan_term * 12, value=0,
+                                        help="0 for no holiday")
+        holiday_length = st.number_input("Holiday Length (months)", min_value=0, max_value=12, value=0)
+        reset_month = st.number_input("Rate Reset At Month", min_value=0, max_value=loan_term * 12, value=0,
+                                      help="0 for a fixed rate")
+        reset_rate = st.number_input("Rate After Reset (%)", min_value=0.0, max_value=50.0,
+                                     value=float(interest_rate), step=0.1)
+
+    events = [Fee(upfront_fee, financed=fee_financed)]
+    events += [Fee(monthly_fee, month=m) for m in range(1, loan_term * 12 + 1)] if monthly_fee else []
+    if balloon_amount:
+        events.append(Balloon(balloon_amount))
+    if holiday_start and holiday_length:
+        events.append(PaymentHoliday(int(holiday_start), int(holiday_length)))
+    if reset_month:
+        events.append(RateReset(int(reset_month), reset_rate))
+
+    with span("event_schedule", events=len(events)):
+        product = event_schedule([Loan(loan_amount, interest_rate, loan_term * 12, events)])
+        rates = effective_rates(product)
+    total_paid = float(product['payment'].sum() + product['fees'].sum())
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("APR", f"{float(rates['apr'][0]):.3f}%")
+    with col2:
+        st.metric("Effective Annual Rate", f"{float(rates['eir'][0]):.3f}%")
+    with col3:
+        st.metric("Total Cost of Credit", f"€{total_paid - float(product['proceeds'][0]):,.2f}")
+
+    import pandas as pd
+
+    st.caption("Payment and closing balance by month (€)")
+    st.line_chart(pd.DataFrame({
+        "Payment": product['payment'][0],
+        "Balance": product['balance'][0]
+    }, index=product['month']))
+
+st.caption(
+    f"Risk-based quote for tier {credit_tier}: {grid_quote['rate']:.2f}% rate, "
+    f"€{grid_quote['monthly_payment']:,.2f} monthly, €{grid_quote['total_cost']:,.2f} total cost"
 )
 
-# Add remaining balance line
-fig.add_trace(
-    go.Scatter(
-        x=years,
-        y=remaining_balance,
-        name="Remaining Balance",
-        mode='lines',
-        line=dict(color='rgb(50, 50, 50)', width=2, dash='dot'),
-    ),
-    secondary_y=True,
+# Additional information
+st.header("Amortization Schedule")
+
+exact_cents = st.checkbox(
+    "Exact cents",
+    help="Compute the schedule monthly in whole cents with banker's rounding and a final-payment "
+         "true-up, so it reconciles with servicer statements"
 )
 
-# Update layout
-fig.update_layout(
-    title="Payment Breakdown by Year",
-    xaxis_title="Year",
-    yaxis_title="Annual Payment (€)",
-    yaxis2_title="Remaining Balance (€)",
-    hovermode='x unified',
-    showlegend=True,
-    legend=dict(
-        yanchor="top",
-        y=0.99,
-        xanchor="left",
-        x=0.01
+@st.cache_data(show_spinner=False)
+def build_schedule(principal, annual_rate, years, payment, exact=False):
+    """Yearly amortization schedule as a float64 DataFrame (formatting is left to the display layer)"""
+    return yearly_schedule(principal, annual_rate, years, payment, exact=exact)
+
+@st.cache_data(show_spinner=False)
+def export_schedule(schedule, file_format):
+    """Serialise the schedule for download"""
+    if file_format == "parquet":
+        import io
+        buffer = io.BytesIO()
+        schedule.to_parquet(buffer, index=False)
+        return buffer.getvalue()
+    return schedule.to_csv(index=False).encode("utf-8")
+
+with span("build_schedule", exact=exact_cents):
+    schedule = build_schedule(loan_amount, interest_rate, loan_term, monthly_payment, exact_cents)
+
+# Create payment visualization. The figure is built once per distinct schedule
+# and reused across reruns; long series are downsampled before they are sent.
+@st.cache_data(show_spinner=False)
+def build_schedule_figure(schedule):
+    from utils.charts import schedule_figure
+    return schedule_figure(
+        schedule["Year"].to_numpy(),
+        schedule["Principal Paid"].to_numpy(),
+        schedule["Interest Paid"].to_numpy(),
+        schedule["Remaining Balance"].to_numpy()
     )
-)
+
+with span("build_schedule_figure"):
+    fig = build_schedule_figure(schedule)
 
 # Display the plot
 st.plotly_chart(fig, use_container_width=True)
 
-# Create a table with payment schedule
-schedule_data = {
-    "Year": years,
-    "Remaining Balance": [f"€{b:,.2f}" for b in remaining_balance],
-    "Interest Paid": [f"€{i:,.2f}" for i in interest_paid],
-    "Principal Paid": [f"€{p:,.2f}" for p in principal_paid]
-}
+# Display the payment schedule; values stay numeric so the table sorts correctly
+money_column = st.column_config.NumberColumn(format="€%.2f")
+st.dataframe(
+    schedule,
+    hide_index=True,
+    column_config={
+        "Year": st.column_config.NumberColumn(format="%d"),
+        "Remaining Balance": money_column,
+        "Interest Paid": money_column,
+        "Principal Paid": money_column
+    }
+)
 
-st.dataframe(schedule_data)
+col1, col2 = st.columns(2)
+with col1:
+    st.download_button(
+        label="Download Schedule (CSV)",
+        data=export_schedule(schedule, "csv"),
+        file_name="amortization_schedule.csv",
+        mime="text/csv"
+    )
+with col2:
+    st.download_button(
+        label="Download Schedule (Parquet)",
+        data=export_schedule(schedule, "parquet"),
+        file_name="amortization_schedule.parquet",
+        mime="application/vnd.apache.parquet"
+    )
 
-# Update disclaimer based on asset class
-if asset_class == "Personal Loan":
-    disclaimer = """
-    This calculator provides estimates for personal loans. 
-    Actual loan terms and rates may vary based on factors such as credit score, 
-    income, debt-to-income ratio, and lender requirements.
-    """
-elif asset_class == "Auto Loan":
-    disclaimer = """
-    This calculator provides estimates for auto loans. 
-    Final terms depend on factors including credit score, vehicle age, 
-    down payment, and lender requirements. Additional costs like insurance
-    are not included in these calculations.
-    """
-else:
-    disclaimer = """
-    This calculator provides estimates for invoice finance facilities. 
-    Actual terms depend on factors such as customer creditworthiness,
-    invoice quality, and business track record. Additional fees may apply.
+# Securitisation structure: treat the loan parameters as a pool and run the
+# tranche waterfall across a range of default scenarios
+st.header("Securitisation Waterfall")
+
+with st.expander("Structure and Scenarios", expanded=False):
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        senior_size = st.slider("Senior (%)", min_value=50, max_value=95, value=80)
+        senior_coupon = st.number_input("Senior Coupon (%)", min_value=0.0, max_value=20.0, value=4.0, step=0.1)
+    with col2:
+        mezz_size = st.slider("Mezzanine (%)", min_value=0, max_value=100 - senior_size, value=min(15, 100 - senior_size))
+        mezz_coupon = st.number_input("Mezzanine Coupon (%)", min_value=0.0, max_value=25.0, value=7.0, step=0.1)
+    with col3:
+        pro_rata = st.checkbox("Pro-rata principal", value=False)
+        loss_trigger = st.number_input("Sequential Trigger (cumulative loss %)", min_value=0.0, max_value=100.0, value=5.0, step=0.5)
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        cpr = st.number_input("CPR (%)", min_value=0.0, max_value=50.0, value=5.0, step=0.5)
+    with col2:
+        cdr = st.number_input("Base CDR (%)", min_value=0.0, max_value=50.0, value=2.0, step=0.5)
+    with col3:
+        severity = st.number_input("Loss Severity (%)", min_value=0.0, max_value=100.0, value=50.0, step=5.0)
+
+@st.cache_data(show_spinner=False)
+def run_structure(pool, annual_rate, years, senior_size, senior_coupon, mezz_size, mezz_coupon,
+                  pro_rata, loss_trigger, cpr, cdr, severity):
+    """Tranche metrics for the base CDR followed by a stress sweep up to 10x the base.
+
+    Period-level cash flows are streamed to an on-disk cube; only its path
+    and the small metric arrays are cached in memory. Least recently used
+    cubes are evicted once the cube directory outgrows its size cap.
     """
+    import hashlib
+    import os
+    import numpy as np
+    from marco.cube import DEFAULT_CUBE_DIR, evict_cubes, run_waterfall_to_cube
+    from marco.waterfall import Structure, Tranche
+
+    senior = pool * senior_size / 100
+    mezz = pool * mezz_size / 100
+    structure = Structure(
+        tranches=[
+            Tranche("Senior", senior, senior_coupon),
+            Tranche("Mezzanine", mezz, mezz_coupon),
+            Tranche("Equity", pool - senior - mezz, 0.0, equity=True)
+        ],
+        pro_rata=pro_rata,
+        loss_trigger=loss_trigger
+    )
+    scenarios = np.concatenate([[cdr], np.linspace(0, max(cdr * 10, 20.0), 41)])
+    key = hashlib.sha1(repr((pool, annual_rate, years, structure, cpr, cdr, severity)).encode()).hexdigest()[:16]
+    cube, metrics = run_waterfall_to_cube(
+        structure, pool, annual_rate, years * 12, cpr, scenarios, severity,
+        os.path.join(DEFAULT_CUBE_DIR, key)
+    )
+    evict_cubes(DEFAULT_CUBE_DIR, keep=[cube.path])
+    return scenarios, cube.series, metrics, cube.path
+
+structure_inputs = (loan_amount, interest_rate, loan_term, senior_size, senior_coupon, mezz_size, mezz_coupon,
+                    pro_rata, loss_trigger, cpr, cdr, severity)
+with span("run_structure"):
+    scenarios, tranche_names, metrics, cube_path = run_structure(*structure_inputs)
+
+import pandas as pd
+
+# Tranches with no balance or that are written off have a NaN yield, shown blank
+st.dataframe(
+    pd.DataFrame({
+        "Tranche": tranche_names,
+        "Yield (%)": metrics["yield"][:, 0],
+        "WAL (years)": metrics["wal"][:, 0],
+        "Loss (%)": metrics["loss"][:, 0]
+    }),
+    hide_index=True,
+    column_config={
+        "Yield (%)": st.column_config.NumberColumn(format="%.2f"),
+        "WAL (years)": st.column_config.NumberColumn(format="%.2f"),
+        "Loss (%)": st.column_config.NumberColumn(format="%.2f")
+    }
+)
+
+st.caption("Tranche loss (%) by CDR")
+st.line_chart(pd.DataFrame(metrics["loss"][:, 1:].T, index=scenarios[1:], columns=tranche_names))
+
+# Monthly cash flows for one tranche and scenario, sliced from the cube on disk
+from marco.cube import Cube
+
+col1, col2 = st.columns(2)
+with col1:
+    cube_tranche = st.selectbox("Tranche", tranche_names)
+with col2:
+    cube_scenario = st.select_slider(
+        "CDR Scenario (%)",
+        options=list(range(len(scenarios))),
+        format_func=lambda i: f"{scenarios[i]:.1f}" + (" (base)" if i == 0 else "")
+    )
+
+def slice_cube(path):
+    cube = Cube(path)
+    return pd.DataFrame({
+        "Interest": cube.slice("interest", cube_tranche, cube_scenario),
+        "Principal": cube.slice("principal", cube_tranche, cube_scenario),
+        "Writedown": cube.slice("writedown", cube_tranche, cube_scenario)
+    }, index=range(1, cube.shape[2] + 1))
+
+with span("cube_slice"):
+    try:
+        cube_flows = slice_cube(cube_path)
+    except OSError:
+        # The cached result outlived its cube: another session's run evicted it
+        run_structure.clear()
+        *_, cube_path = run_structure(*structure_inputs)
+        cube_flows = slice_cube(cube_path)
+st.line_chart(cube_flows)
 
 st.caption(disclaimer)
+
+run.finish()
+performance_panel("abs_page")
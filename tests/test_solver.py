@@ -0,0 +1,21 @@
+import numpy as np
+
+from marco.pricing.solver import MAX_MONTHLY_RATE, rate_for_payment
+
+
+def test_rate_for_payment_recovers_quoted_rate():
+    # 1000 over 12 months at 12% a year has a level payment of 88.85
+    rate = rate_for_payment([1000], [88.848788], [1])
+    assert np.allclose(rate, [12.0], atol=1e-4)
+
+
+def test_rate_for_payment_is_nan_above_search_bound():
+    # Paying 5000 a month on 1000 implies a rate far above MAX_MONTHLY_RATE;
+    # the bisection must not report the bound itself as the solution
+    rate = rate_for_payment([1000], [5000], [1])
+    assert np.isnan(rate).all()
+    assert not np.any(rate == MAX_MONTHLY_RATE * 12 * 100)
+
+
+def test_rate_for_payment_is_nan_when_payment_never_repays():
+    assert np.isnan(rate_for_payment([1000], [50], [1])).all()
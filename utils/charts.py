@@ -0,0 +1,137 @@
+import numpy as np
+
+# Traces longer than this are downsampled before they are sent to the browser
+MAX_POINTS = 500
+
+PRINCIPAL_COLOR = 'rgb(73, 163, 156)'
+INTEREST_COLOR = 'rgb(255, 144, 144)'
+BALANCE_COLOR = 'rgb(50, 50, 50)'
+
+
+def lttb(x, y, n_out):
+    """Downsample a series to n_out points with largest-triangle-three-buckets.
+
+    Returns the indices of the kept points so that several series sharing the
+    same x axis can be sliced consistently.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # First and last points are always kept; the rest is split into buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0] = 0
+    keep[-1] = n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        # Average of the next bucket (or the last point) is the third vertex
+        if i < n_out - 3:
+            next_start, next_end = edges[i + 1], edges[i + 2]
+            avg_x = x[next_start:next_end].mean()
+            avg_y = y[next_start:next_end].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        keep[i + 1] = a
+
+    return keep
+
+
+def downsample(x, series, max_points=MAX_POINTS):
+    """Downsample an x axis and a dict of y series sharing it.
+
+    Points are chosen by LTTB on the envelope (sum of absolute values) of all
+    series so that peaks in any of them survive.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    series = {name: np.asarray(y, dtype=np.float64) for name, y in series.items()}
+    if len(x) <= max_points:
+        return x, series
+
+    envelope = np.sum([np.abs(y) for y in series.values()], axis=0)
+    keep = lttb(x, envelope, max_points)
+    return x[keep], {name: y[keep] for name, y in series.items()}
+
+
+def schedule_figure(periods, principal, interest, balance, period_label="Year",
+                    payment_label="Annual Payment", currency="€", max_points=MAX_POINTS):
+    """Build the principal / interest / remaining balance chart for a schedule.
+
+    Series are passed to plotly as float32 NumPy arrays, which plotly serialises
+    as base64 typed arrays instead of JSON number lists.
+    """
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    x, series = downsample(periods, {
+        'principal': principal,
+        'interest': interest,
+        'balance': balance,
+    }, max_points)
+    x = x.astype(np.float32)
+    series = {name: y.astype(np.float32) for name, y in series.items()}
+
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+
+    # Add area traces for principal and interest
+    fig.add_trace(
+        go.Scatter(
+            x=x,
+            y=series['principal'],
+            name="Principal",
+            fill='tonexty',
+            mode='lines',
+            line=dict(width=0.5, color=PRINCIPAL_COLOR),
+            stackgroup='one'
+        )
+    )
+
+    fig.add_trace(
+        go.Scatter(
+            x=x,
+            y=series['interest'],
+            name="Interest",
+            fill='tonexty',
+            mode='lines',
+            line=dict(width=0.5, color=INTEREST_COLOR),
+            stackgroup='one'
+        )
+    )
+
+    # Add remaining balance line
+    fig.add_trace(
+        go.Scatter(
+            x=x,
+            y=series['balance'],
+            name="Remaining Balance",
+            mode='lines',
+            line=dict(color=BALANCE_COLOR, width=2, dash='dot'),
+        ),
+        secondary_y=True,
+    )
+
+    fig.update_layout(
+        title=f"Payment Breakdown by {period_label}",
+        xaxis_title=period_label,
+        yaxis_title=f"{payment_label} ({currency})",
+        yaxis2_title=f"Remaining Balance ({currency})",
+        hovermode='x unified',
+        showlegend=True,
+        legend=dict(
+            yanchor="top",
+            y=0.99,
+            xanchor="left",
+            x=0.01
+        )
+    )
+    return fig
@@ -0,0 +1,82 @@
+"""Import-time profile report for the app's modules.
+
+Runs each target in a fresh interpreter with ``python -X importtime`` and
+prints the slowest imports, so cold-start regressions are easy to spot.
+
+Usage:
+    python utils/import_profile.py                      # default targets
+    python utils/import_profile.py ai.analysis_agent    # specific modules
+    python utils/import_profile.py --top 30 --file Home.py
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+DEFAULT_MODULES = [
+    'streamlit',
+    'ai.analysis_agent',
+    'plotly.graph_objects',
+    'langchain.chat_models',
+    'langchain.document_loaders',
+]
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def profile_import(statement):
+    """Run a statement under -X importtime and return (module, self_us, cumulative_us) rows"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True
+    )
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        rows.append((module.rstrip(), int(self_us), int(cumulative_us)))
+
+    if result.returncode != 0 and not rows:
+        raise Exception(f"Failed to profile '{statement}': {result.stderr.strip().splitlines()[-1]}")
+    return rows
+
+
+def format_report(target, rows, top):
+    """Format the slowest imports of a profile run as a plain-text table"""
+    total_us = sum(self_us for _, self_us, _ in rows)
+    lines = [f"{target}: {total_us / 1000:,.1f} ms total, {len(rows)} modules"]
+    for module, self_us, cumulative_us in sorted(rows, key=lambda r: r[2], reverse=True)[:top]:
+        lines.append(f"  {cumulative_us / 1000:>10,.1f} ms cum  {self_us / 1000:>8,.1f} ms self  {module}")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report import times for app modules")
+    parser.add_argument('modules', nargs='*', help="Modules to import (default: app hot spots)")
+    parser.add_argument('--file', action='append', default=[],
+                        help="Source file to compile and import-scan (e.g. Home.py); repeatable")
+    parser.add_argument('--top', type=int, default=15, help="Number of slowest imports to list")
+    args = parser.parse_args()
+
+    targets = [(m, f"import {m}") for m in (args.modules or DEFAULT_MODULES)]
+    for path in args.file:
+        # Only the import statements are executed, so Streamlit calls in the page are skipped
+        with open(os.path.join(ROOT_DIR, path), 'r', encoding='utf-8') as f:
+            imports = [line.strip() for line in f
+                       if line.startswith('import ') or line.startswith('from ')]
+        targets.append((path, '\n'.join(imports) or 'pass'))
+
+    for target, statement in targets:
+        try:
+            print(format_report(target, profile_import(statement), args.top))
+        except Exception as e:
+            print(f"{target}: {e}")
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""Render prospectuses from the command line.
+
+Usage:
+    python utils/pdf_generator.py prospectus.md              # Markdown file -> PDF
+    python utils/pdf_generator.py --company "Acme AS"        # latest stored record
+    python utils/pdf_generator.py --all --format md html pdf --workers 8
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.prospectus import FORMATS, HTML_STYLE, render_batch, render_pdf
+from utils.record_store import DEFAULT_DB_PATH, RecordStore
+
+
+def markdown_file_to_pdf(path):
+    """Convert a Markdown prospectus file to a PDF next to it"""
+    from markdown import markdown
+
+    with open(path, 'r', encoding='utf-8') as f:
+        body = markdown(f.read())
+    html_content = (
+        f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><style>{HTML_STYLE}</style></head>"
+        f"<body>\n{body}\n</body></html>\n"
+    )
+    return render_pdf(html_content, os.path.splitext(path)[0] + '.pdf')
+
+
+def latest_records(store, companies=None):
+    """Latest stored record data for the given companies, or for every company"""
+    if companies:
+        records = [store.latest(company_name=name) for name in companies]
+        missing = [name for name, record in zip(companies, records) if record is None]
+        if missing:
+            raise Exception(f"No stored records for: {', '.join(missing)}")
+        return [record['data'] for record in records]
+
+    return [record['data'] for record in store.all_latest()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render company prospectuses")
+    parser.add_argument('files', nargs='*', help="Markdown prospectus files to convert to PDF")
+    parser.add_argument('--company', action='append', help="Company to render from the record store; repeatable")
+    parser.add_argument('--all', action='store_true', help="Render the latest record of every company")
+    parser.add_argument('--format', nargs='+', default=['pdf'], choices=FORMATS, help="Output formats")
+    parser.add_argument('--output-dir', default='prospectuses')
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help="Record store path")
+    args = parser.parse_args()
+
+    if not (args.files or args.company or args.all):
+        parser.error("Give Markdown files, --company or --all")
+
+    for path in args.files:
+        print(f"Wrote {markdown_file_to_pdf(path)}")
+
+    if args.company or args.all:
+        store = RecordStore(args.db)
+        records = latest_records(store, args.company)
+        store.close()
+
+        stats = render_batch(records, args.format, args.output_dir, args.workers)
+        for index, error in stats['errors']:
+            print(f"Record {index}: {error}", file=sys.stderr)
+        print(
+            f"Rendered {stats['rendered']} of {len(records)} prospectuses to {args.output_dir} "
+            f"in {stats['seconds']:.2f}s ({stats['documents_per_second']:.1f} documents/s)"
+        )
+
+
+if __name__ == '__main__':
+    main()
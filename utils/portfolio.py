@@ -0,0 +1,136 @@
+"""Portfolio analytics over all onboarded companies.
+
+The latest record of every company in the RecordStore is typed once
+(ai.typed_fields) and held as a columnar Arrow table. refresh() only reads
+and types records saved since the previous refresh and replaces the older
+versions they supersede, so keeping the table current costs the new records,
+not the whole archive. Filters and group-bys run as Arrow compute kernels.
+
+Offering sizes are in each company's own currency and are never added across
+currencies: group-bys aggregate per (group, currency).
+"""
+import threading
+import time
+
+from ai.typed_fields import to_arrow, type_batch
+
+# Columns offered for group-by on the dashboard
+GROUP_COLUMNS = ('jurisdiction', 'stock_exchange', 'company_type', 'currency')
+
+
+class PortfolioAnalytics:
+    """Columnar view of the latest record per company"""
+
+    def __init__(self, store, workers=None):
+        self.store = store
+        self.workers = workers
+        self.table = None
+        self.last_id = 0
+        # One instance serves every Streamlit session; refreshes must not interleave
+        self.lock = threading.Lock()
+        self.stats = {'refreshes': 0, 'records_added': 0, 'last_refresh_seconds': 0.0}
+
+    def refresh(self):
+        """Pull records saved since the last refresh; returns the number added"""
+        with self.lock:
+            return self._refresh()
+
+    def _refresh(self):
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        start = time.perf_counter()
+        records = self.store.since(self.last_id)
+        if not records:
+            return 0
+
+        last_id = records[-1]['id']
+        # Within a refresh a company may have several new versions; keep the last
+        latest = {}
+        for record in records:
+            latest[record['company_key']] = record
+        records = list(latest.values())
+
+        typed = type_batch([record['data'] for record in records], workers=self.workers)['records']
+        batch = to_arrow(typed)
+        batch = batch.append_column('company_key', pa.array([r['company_key'] for r in records], pa.string()))
+        batch = batch.append_column('version', pa.array([r['version'] for r in records], pa.int32()))
+        batch = batch.append_column('record_id', pa.array([r['id'] for r in records], pa.int64()))
+        batch = batch.append_column('offering_size', pc.multiply(batch['maximum_shares'], batch['price_per_share']))
+
+        if self.table is None:
+            self.table = batch
+        else:
+            superseded = pc.is_in(self.table['company_key'], value_set=batch['company_key'])
+            self.table = pa.concat_tables([self.table.filter(pc.invert(superseded)), batch])
+            # Every refresh appends a chunk; compact once there are many
+            if self.table['company_key'].num_chunks > 64:
+                self.table = self.table.combine_chunks()
+
+        self.last_id = last_id
+        self.stats['refreshes'] += 1
+        self.stats['records_added'] += len(records)
+        self.stats['last_refresh_seconds'] = time.perf_counter() - start
+        return len(records)
+
+    def filter(self, jurisdiction=None, stock_exchange=None, currency=None, min_offering=None,
+               max_offering=None, offering_from=None, offering_to=None):
+        """Companies matching every given condition.
+
+        jurisdiction, stock_exchange and currency take a value or a list of
+        values. Offering size bounds are in the companies' own currency, so
+        combine them with a currency. The offering window keeps offerings
+        that overlap [offering_from, offering_to].
+        """
+        import pyarrow.compute as pc
+
+        table = self.table
+        if table is None:
+            return None
+        conditions = []
+        for column, value in (('jurisdiction', jurisdiction), ('stock_exchange', stock_exchange),
+                              ('currency', currency)):
+            if value:
+                values = value if isinstance(value, (list, tuple, set)) else [value]
+                conditions.append(pc.is_in(table[column], value_set=pc.cast(list(values), table[column].type)))
+        if min_offering is not None:
+            conditions.append(pc.greater_equal(table['offering_size'], min_offering))
+        if max_offering is not None:
+            conditions.append(pc.less_equal(table['offering_size'], max_offering))
+        if offering_from is not None:
+            conditions.append(pc.greater_equal(pc.coalesce(table['offering_end'], table['offering_start']),
+                                               offering_from))
+        if offering_to is not None:
+            conditions.append(pc.less_equal(pc.coalesce(table['offering_start'], table['offering_end']),
+                                            offering_to))
+        if not conditions:
+            return table
+
+        mask = conditions[0]
+        for condition in conditions[1:]:
+            mask = pc.and_(mask, condition)
+        # Rows with unknown values for a filtered column are excluded
+        return table.filter(pc.fill_null(mask, False))
+
+    def group_by(self, column, table=None):
+        """Company count, total and median offering size and mean share price per group and currency"""
+        if column not in GROUP_COLUMNS:
+            raise ValueError(f"Cannot group by '{column}'; use one of: {', '.join(GROUP_COLUMNS)}")
+        table = self.table if table is None else table
+        if table is None:
+            return None
+        keys = [column] if column == 'currency' else [column, 'currency']
+        result = table.group_by(keys).aggregate([
+            ('company_key', 'count'),
+            ('offering_size', 'sum'),
+            ('offering_size', 'approximate_median'),
+            ('price_per_share', 'mean')
+        ])
+        names = {
+            'company_key_count': 'companies',
+            'offering_size_sum': 'total_offering',
+            'offering_size_approximate_median': 'median_offering',
+            'price_per_share_mean': 'mean_price_per_share'
+        }
+        result = result.rename_columns([names.get(name, name) for name in result.column_names])
+        return result.select([*keys, *names.values()]).sort_by([('companies', 'descending')])
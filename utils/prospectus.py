@@ -0,0 +1,203 @@
+"""Prospectus rendering to Markdown, HTML and PDF.
+
+Section and field layouts are compiled once per renderer, documents are
+assembled with list joins, and batches are spread over a process pool.
+PDFs are rendered locally with wkhtmltopdf through pdfkit.
+"""
+import html
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+SECTIONS = {
+    'basic_information': "Basic Information",
+    'share_offering_details': "Share Offering Details",
+    'company_overview': "Company Overview",
+    'management_structure': "Management Structure",
+    'financial_information': "Financial Information",
+    'market_analysis': "Market Analysis",
+    'risk_factors': "Risk Factors",
+    'future_plans': "Future Plans"
+}
+
+REQUIRED_SECTIONS = [
+    'basic_information',
+    'share_offering_details',
+    'company_overview'
+]
+
+HTML_STYLE = (
+    "body{font-family:Helvetica,Arial,sans-serif;margin:2em;line-height:1.4}"
+    "h1{border-bottom:2px solid #333}h2{margin-top:1.5em;color:#333}"
+    "dt{font-weight:bold}dd{margin:0 0 .8em 0}"
+)
+
+FORMATS = ('md', 'html', 'pdf')
+
+
+def validate_data(data):
+    """Validate that the extracted data contains required fields"""
+    if not isinstance(data, dict):
+        raise ValueError("Invalid data format - expected dictionary")
+
+    missing_sections = [section for section in REQUIRED_SECTIONS if section not in data]
+    if missing_sections:
+        raise ValueError(f"Missing required sections: {', '.join(missing_sections)}")
+
+    # Validate basic information
+    if not data['basic_information'].get('-_company_name'):
+        raise ValueError("Company name is required")
+
+    return True
+
+
+def clean_value(value):
+    """Clean and format value for markdown"""
+    if value is None or value == '':
+        return 'Not provided'
+    return str(value).strip()
+
+
+def field_title(key):
+    """Display title for a parsed field key, e.g. '-_company_name' -> 'Company Name'"""
+    return key.replace('-_', '').replace('_', ' ').title()
+
+
+class ProspectusRenderer:
+    """Renders extracted company records with a precompiled layout"""
+
+    def __init__(self, sections=SECTIONS):
+        # Section headings are formatted once; field titles are memoised as they are seen
+        self.sections = [
+            (key, f"## {title}\n\n", f"<h2>{html.escape(title)}</h2>\n<dl>\n")
+            for key, title in sections.items()
+        ]
+        self.titles = {}
+
+    def _title(self, key):
+        title = self.titles.get(key)
+        if title is None:
+            title = self.titles[key] = field_title(key)
+        return title
+
+    def _fields(self, data):
+        """Yield (section markdown heading, section html heading, [(title, value)]) for non-empty sections"""
+        for key, md_heading, html_heading in self.sections:
+            section_data = data.get(key)
+            if not isinstance(section_data, dict) or not section_data:
+                continue
+            fields = [(self._title(k), clean_value(v)) for k, v in section_data.items() if v]
+            if fields:
+                yield md_heading, html_heading, fields
+
+    def render_markdown(self, data, generated_on):
+        parts = ["# Company Prospectus\n\n", f"Generated on: {generated_on}\n\n"]
+        for md_heading, _, fields in self._fields(data):
+            parts.append(md_heading)
+            parts.extend(f"**{title}**: {value}\n\n" for title, value in fields)
+        if len(parts) == 2:
+            raise ValueError("No valid data found to generate prospectus")
+        return ''.join(parts)
+
+    def render_html(self, data, generated_on):
+        company_name = html.escape(clean_value(data.get('basic_information', {}).get('-_company_name')))
+        parts = [
+            f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>{company_name} Prospectus</title>"
+            f"<style>{HTML_STYLE}</style></head><body>\n",
+            "<h1>Company Prospectus</h1>\n",
+            f"<p>Generated on: {html.escape(generated_on)}</p>\n"
+        ]
+        for _, html_heading, fields in self._fields(data):
+            parts.append(html_heading)
+            parts.extend(
+                f"<dt>{html.escape(title)}</dt><dd>{html.escape(value)}</dd>\n" for title, value in fields
+            )
+            parts.append("</dl>\n")
+        parts.append("</body></html>\n")
+        return ''.join(parts)
+
+
+def render_pdf(html_content, path):
+    """Write HTML to a PDF file with the local wkhtmltopdf binary"""
+    try:
+        import pdfkit
+    except ImportError:
+        raise Exception("PDF rendering requires pdfkit and wkhtmltopdf to be installed")
+    pdfkit.from_string(html_content, path, options={'quiet': '', 'encoding': 'UTF-8'})
+    return path
+
+
+def safe_filename(company_name):
+    return ''.join(c for c in company_name if c.isalnum() or c in (' ', '-', '_')).strip() or 'company'
+
+
+# Each worker process compiles its own renderer once
+_worker_renderer = None
+
+
+def _render_one(args):
+    data, formats, output_dir, generated_on = args
+    global _worker_renderer
+    if _worker_renderer is None:
+        _worker_renderer = ProspectusRenderer()
+
+    try:
+        validate_data(data)
+        name = safe_filename(data['basic_information']['-_company_name'])
+        base = os.path.join(output_dir, f"{name}_prospectus")
+        paths = []
+        if 'md' in formats:
+            with open(f"{base}.md", 'w', encoding='utf-8') as f:
+                f.write(_worker_renderer.render_markdown(data, generated_on))
+            paths.append(f"{base}.md")
+        if 'html' in formats or 'pdf' in formats:
+            html_content = _worker_renderer.render_html(data, generated_on)
+            if 'html' in formats:
+                with open(f"{base}.html", 'w', encoding='utf-8') as f:
+                    f.write(html_content)
+                paths.append(f"{base}.html")
+            if 'pdf' in formats:
+                paths.append(render_pdf(html_content, f"{base}.pdf"))
+        return paths, None
+    except Exception as e:
+        return [], str(e)
+
+
+def render_batch(records, formats=('md', 'html'), output_dir='prospectuses', workers=None, chunksize=16):
+    """Render many records in parallel worker processes.
+
+    Returns a dict with the written paths, per-record errors and throughput
+    in documents per second.
+    """
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        raise ValueError(f"Unknown formats: {', '.join(sorted(unknown))}")
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    # One timestamp for the whole refresh
+    generated_on = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    jobs = [(data, tuple(formats), output_dir, generated_on) for data in records]
+
+    start = time.perf_counter()
+    if workers == 1 or len(jobs) <= 1:
+        results = [_render_one(job) for job in jobs]
+    else:
+        # Spawned, not forked: the Streamlit server calling this is multithreaded
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=multiprocessing.get_context('spawn')) as executor:
+            results = list(executor.map(_render_one, jobs, chunksize=chunksize))
+    elapsed = time.perf_counter() - start
+
+    paths = [path for written, _ in results for path in written]
+    errors = [(i, error) for i, (_, error) in enumerate(results) if error]
+    rendered = len(results) - len(errors)
+    return {
+        'rendered': rendered,
+        'paths': paths,
+        'errors': errors,
+        'seconds': elapsed,
+        'documents_per_second': rendered / elapsed if elapsed > 0 else float('inf')
+    }
@@ -0,0 +1,203 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+DEFAULT_DB_PATH = os.path.join('data', 'records.db')
+
+# Fields pulled out of the JSON document into indexed expressions. Keys follow
+# the parser's naming, e.g. "- Company Name" becomes "-_company_name".
+INDEXED_FIELDS = {
+    'jurisdiction': ('basic_information', '-_jurisdiction'),
+    'stock_exchange': ('basic_information', '-_stock_exchange'),
+    'company_type': ('basic_information', '-_company_type'),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    id INTEGER PRIMARY KEY,
+    company_key TEXT NOT NULL,
+    company_name TEXT NOT NULL,
+    registry_code TEXT,
+    version INTEGER NOT NULL,
+    created_at TEXT NOT NULL,
+    data TEXT NOT NULL,
+    markdown TEXT,
+    UNIQUE (company_key, version)
+);
+CREATE INDEX IF NOT EXISTS idx_records_registry_code ON records (registry_code, version);
+CREATE INDEX IF NOT EXISTS idx_records_created_at ON records (created_at);
+"""
+
+
+def json_path(section, field):
+    """SQLite JSON path for a section field"""
+    return f'$."{section}"."{field}"'
+
+
+# Values the model writes for a company name it could not find, as company keys
+PLACEHOLDER_NAMES = {'not specified', 'not provided', 'not available', 'not found', 'not mentioned',
+                     'unknown', 'na', 'none'}
+
+
+def company_key(company_name):
+    """Normalised company name used as the lookup key"""
+    return ' '.join(''.join(c for c in company_name.lower() if c.isalnum() or c.isspace()).split())
+
+
+class RecordStore:
+    """Versioned store of extracted onboarding records backed by SQLite.
+
+    Every save adds a new version for the company; the full record is kept as
+    a JSON document and common fields are indexed through json_extract
+    expressions, so lookups stay index-backed as the archive grows.
+    """
+
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        directory = os.path.dirname(db_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self.db_path = db_path
+        # One connection is shared across Streamlit sessions, so every statement
+        # is serialised; a read must not see another thread's uncommitted rows
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(SCHEMA)
+        for name, (section, field) in INDEXED_FIELDS.items():
+            self.conn.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_records_{name} "
+                f"ON records (json_extract(data, '{json_path(section, field)}'))"
+            )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def save(self, data, company_name=None, markdown=None):
+        """Store a new version of a company's record and return (id, version).
+
+        Records are keyed by company name, so a record without one is
+        rejected with ValueError rather than filed under a shared
+        placeholder that every other nameless record would overwrite.
+        """
+        basic_info = data.get('basic_information', {})
+        company_name = company_name or basic_info.get('-_company_name')
+        key = company_key(company_name or '')
+        if key in PLACEHOLDER_NAMES:
+            key = ''
+        if not key:
+            raise ValueError("Record has no company name to file it under")
+
+        with self.lock, self.conn:
+            row = self.conn.execute(
+                'SELECT COALESCE(MAX(version), 0) FROM records WHERE company_key = ?', (key,)
+            ).fetchone()
+            version = row[0] + 1
+            cursor = self.conn.execute(
+                'INSERT INTO records (company_key, company_name, registry_code, version, created_at, data, markdown) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (
+                    key,
+                    company_name,
+                    basic_info.get('-_company_registry_code') or None,
+                    version,
+                    datetime.now().isoformat(timespec='seconds'),
+                    json.dumps(data, ensure_ascii=False),
+                    markdown
+                )
+            )
+        return cursor.lastrowid, version
+
+    def attach_markdown(self, company_name, markdown):
+        """Attach rendered markdown to the latest version of a company's record"""
+        with self.lock, self.conn:
+            cursor = self.conn.execute(
+                'UPDATE records SET markdown = ? WHERE id = ('
+                'SELECT id FROM records WHERE company_key = ? ORDER BY version DESC LIMIT 1)',
+                (markdown, company_key(company_name))
+            )
+        return cursor.rowcount > 0
+
+    def latest(self, company_name=None, registry_code=None):
+        """Latest version of a record by company name or registry code, or None"""
+        if company_name is not None:
+            column, value = 'company_key', company_key(company_name)
+        elif registry_code is not None:
+            column, value = 'registry_code', registry_code
+        else:
+            raise ValueError("Either company_name or registry_code is required")
+        rows = self._query(f'SELECT * FROM records WHERE {column} = ? ORDER BY version DESC LIMIT 1', (value,))
+        return rows[0] if rows else None
+
+    def history(self, company_name):
+        """All versions of a company's record, newest first"""
+        return self._query(
+            'SELECT * FROM records WHERE company_key = ? ORDER BY version DESC',
+            (company_key(company_name),)
+        )
+
+    def all_latest(self):
+        """Latest version of every company's record"""
+        return self._query(
+            'SELECT * FROM records AS r WHERE version = '
+            '(SELECT MAX(version) FROM records WHERE company_key = r.company_key)'
+        )
+
+    def since(self, record_id=0):
+        """Records saved after record_id, oldest first, for incremental consumers"""
+        return self._query('SELECT * FROM records WHERE id > ? ORDER BY id', (record_id,))
+
+    def find(self, limit=100, **filters):
+        """Latest records matching indexed fields, e.g. find(jurisdiction='Estonia')"""
+        clauses = ['version = (SELECT MAX(version) FROM records AS r WHERE r.company_key = records.company_key)']
+        params = []
+        for name, value in filters.items():
+            if name not in INDEXED_FIELDS:
+                raise ValueError(f"Field '{name}' is not indexed; use one of: {', '.join(INDEXED_FIELDS)}")
+            section, field = INDEXED_FIELDS[name]
+            clauses.append(f"json_extract(data, '{json_path(section, field)}') = ?")
+            params.append(value)
+
+        return self._query(
+            f"SELECT * FROM records WHERE {' AND '.join(clauses)} ORDER BY created_at DESC LIMIT ?",
+            (*params, limit)
+        )
+
+    def import_json_files(self, data_dir='data'):
+        """Load legacy timestamped JSON files into the store; returns the number imported"""
+        if not os.path.exists(data_dir):
+            return 0
+
+        # Oldest first so versions follow the original save order
+        filenames = sorted(
+            (f for f in os.listdir(data_dir) if f.endswith('.json')),
+            key=lambda f: os.path.getmtime(os.path.join(data_dir, f))
+        )
+        imported = 0
+        for filename in filenames:
+            with open(os.path.join(data_dir, filename), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            try:
+                self.save(data)
+            except ValueError:
+                continue  # no company name to key the record by
+            imported += 1
+        return imported
+
+    def _query(self, sql, params=()):
+        """Rows of a read, fetched under the lock so no write is in flight"""
+        with self.lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [self._to_record(row) for row in rows]
+
+    @staticmethod
+    def _to_record(row):
+        if row is None:
+            return None
+        record = dict(row)
+        record['data'] = json.loads(record['data'])
+        return record
@@ -0,0 +1,208 @@
+"""Per-session storage for uploads and analysis results with a memory budget.
+
+Streamlit keeps st.session_state in server memory for as long as a browser
+tab lives, so large uploads and results from many analysts add up without
+bound. SessionResources holds them instead: values above a size threshold
+go straight to disk, smaller ones stay in memory until the shared memory
+budget is exceeded, at which point the least recently used sessions are
+spilled to disk. Sessions idle for longer than the TTL are dropped entirely.
+Pages keep only small handles in st.session_state.
+"""
+import os
+import pickle
+import shutil
+import threading
+import time
+
+DEFAULT_SESSION_DIR = os.path.join('data', 'sessions')
+
+
+class StoredUpload:
+    """Stand-in for a Streamlit UploadedFile whose bytes live in SessionResources.
+
+    Exposes the attributes the analysis code uses (name, type, size,
+    getvalue) without holding the file in memory.
+    """
+
+    def __init__(self, resources, session_id, key, name, file_type, size):
+        self.resources = resources
+        self.session_id = session_id
+        self.key = key
+        self.name = name
+        self.type = file_type
+        self.size = size
+
+    def getvalue(self):
+        data = self.resources.get(self.session_id, self.key)
+        if data is None:
+            raise FileNotFoundError(f"Upload '{self.name}' has expired; please upload it again")
+        return data
+
+
+class SessionResources:
+    """Memory-accounted key-value store per session, spilling to disk"""
+
+    def __init__(self, directory=DEFAULT_SESSION_DIR, memory_limit=256 * 1024 * 1024,
+                 spill_threshold=1024 * 1024, ttl_seconds=3600):
+        self.directory = directory
+        self.memory_limit = memory_limit
+        self.spill_threshold = spill_threshold
+        self.ttl_seconds = ttl_seconds
+        self.lock = threading.Lock()
+        # session_id -> {'last_access': float, 'items': {key: {'value', 'path', 'size'}}}
+        self.sessions = {}
+        self.stats = {'spills': 0, 'expired_sessions': 0}
+
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        self._remove_stale_directories()
+
+    def _remove_stale_directories(self):
+        """Drop spill directories left behind by a previous server process"""
+        cutoff = time.time() - self.ttl_seconds
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if os.path.isdir(path) and os.path.getmtime(path) < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+
+    def _session(self, session_id):
+        session = self.sessions.setdefault(session_id, {'last_access': 0.0, 'items': {}})
+        session['last_access'] = time.time()
+        return session
+
+    def _spill(self, session_id, key, item):
+        session_dir = os.path.join(self.directory, session_id)
+        if not os.path.exists(session_dir):
+            os.makedirs(session_dir)
+        path = os.path.join(session_dir, f"{key}.pkl")
+        # Write then rename so a get() reading outside the lock never sees a partial file
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(item['value'], f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        item['value'] = None
+        item['path'] = path
+        self.stats['spills'] += 1
+
+    def memory_bytes(self):
+        return sum(
+            item['size'] for session in self.sessions.values()
+            for item in session['items'].values() if item['path'] is None
+        )
+
+    def put(self, session_id, key, value):
+        """Store a value for a session, replacing any previous value under key"""
+        size = len(value) if isinstance(value, (bytes, bytearray)) else len(
+            pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        )
+        with self.lock:
+            session = self._session(session_id)
+            self._discard(session['items'].pop(key, None))
+            item = {'value': value, 'path': None, 'size': size}
+            session['items'][key] = item
+            if size > self.spill_threshold:
+                self._spill(session_id, key, item)
+            self._enforce_budget()
+        return size
+
+    def get(self, session_id, key, default=None):
+        """A session's value, loaded back from disk if it was spilled"""
+        with self.lock:
+            session = self.sessions.get(session_id)
+            if session is None or key not in session['items']:
+                return default
+            session['last_access'] = time.time()
+            item = session['items'][key]
+            if item['path'] is None:
+                return item['value']
+            path = item['path']
+        # Spilled values are read on demand and not brought back into memory. The
+        # file is read outside the lock, so the value may be deleted or its
+        # session expired in the meantime; that reads as a missing value
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return default
+
+    def contains(self, session_id, key):
+        with self.lock:
+            session = self.sessions.get(session_id)
+            return session is not None and key in session['items']
+
+    def touch(self, session_id):
+        """Mark a session as active so its data is not expired"""
+        with self.lock:
+            if session_id in self.sessions:
+                self.sessions[session_id]['last_access'] = time.time()
+
+    def put_upload(self, session_id, uploaded_file, key='upload'):
+        """Store an UploadedFile's bytes and return a lightweight StoredUpload handle"""
+        data = uploaded_file.getvalue()
+        self.put(session_id, key, data)
+        return StoredUpload(self, session_id, key, uploaded_file.name, uploaded_file.type, len(data))
+
+    def delete(self, session_id, key):
+        with self.lock:
+            session = self.sessions.get(session_id)
+            if session is not None:
+                self._discard(session['items'].pop(key, None))
+
+    @staticmethod
+    def _discard(item):
+        if item is not None and item['path'] is not None and os.path.exists(item['path']):
+            os.remove(item['path'])
+
+    def drop_session(self, session_id):
+        with self.lock:
+            self._drop(session_id)
+
+    def _drop(self, session_id):
+        self.sessions.pop(session_id, None)
+        shutil.rmtree(os.path.join(self.directory, session_id), ignore_errors=True)
+
+    def _enforce_budget(self):
+        """Expire idle sessions, then spill least recently used sessions until under budget"""
+        now = time.time()
+        for session_id in [s for s, session in self.sessions.items()
+                           if now - session['last_access'] > self.ttl_seconds]:
+            self._drop(session_id)
+            self.stats['expired_sessions'] += 1
+
+        memory = self.memory_bytes()
+        if memory <= self.memory_limit:
+            return
+        by_age = sorted(self.sessions.items(), key=lambda entry: entry[1]['last_access'])
+        for session_id, session in by_age:
+            for key, item in session['items'].items():
+                if item['path'] is None:
+                    self._spill(session_id, key, item)
+                    memory -= item['size']
+                if memory <= self.memory_limit:
+                    return
+
+    def expire(self):
+        """Apply the TTL and memory budget now; call on every rerun"""
+        with self.lock:
+            self._enforce_budget()
+
+    def gauges(self, session_id=None):
+        """Memory and disk usage overall and, if given, for one session"""
+        with self.lock:
+            def usage(sessions):
+                items = [item for session in sessions for item in session['items'].values()]
+                return {
+                    'memory_bytes': sum(item['size'] for item in items if item['path'] is None),
+                    'disk_bytes': sum(item['size'] for item in items if item['path'] is not None)
+                }
+
+            result = {
+                'sessions': len(self.sessions),
+                'memory_limit': self.memory_limit,
+                **usage(self.sessions.values()),
+                **self.stats
+            }
+            if session_id is not None:
+                session = self.sessions.get(session_id)
+                result['session'] = usage([session] if session else [])
+            return result
@@ -0,0 +1,369 @@
+"""Lightweight tracing and profiling for page reruns and agent pipelines.
+
+Spans nest through a context variable, so instrumented functions need no
+tracer argument:
+
+    with tracer.trace("abs_page"):          # root span: one run
+        with span("loan_summary"):
+            ...
+
+    run = tracer.begin("abs_page")          # or around a whole script
+    ...
+    run.finish()
+
+    @traced("extract")
+    def _extract(...): ...
+
+Finished runs are kept in memory (the last N, for the in-app performance
+panel) and, when configured, exported as OTLP/JSON: appended to a local
+file (MARCO_TRACE_FILE) and/or posted to an OpenTelemetry collector
+(OTEL_EXPORTER_OTLP_ENDPOINT). An optional sampling profiler records where
+a run spends its time below the span level.
+"""
+import collections
+import contextvars
+import functools
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+import urllib.request
+
+_current_span = contextvars.ContextVar('marco_current_span', default=None)
+
+SERVICE_NAME = 'marco'
+
+
+class Span:
+    __slots__ = ('tracer', 'name', 'attributes', 'trace_id', 'span_id', 'parent', 'children',
+                 'start_ns', 'end_ns', 'error', '_token', '_sampler', '_sampling')
+
+    def __init__(self, tracer, name, attributes=None, sampling=False):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.parent = _current_span.get()
+        self.trace_id = self.parent.trace_id if self.parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.children = []
+        self.start_ns = self.end_ns = 0
+        self.error = None
+        self._token = None
+        self._sampler = None
+        self._sampling = sampling
+
+    @property
+    def duration_ms(self):
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def start(self):
+        """Enter the span without a with-block, e.g. at the top of a Streamlit script"""
+        return self.__enter__()
+
+    def finish(self):
+        self.__exit__(None, None, None)
+
+    def __enter__(self):
+        if self.parent is not None:
+            self.parent.children.append(self)
+        elif self._sampling:
+            self._sampler = SamplingProfiler(threading.get_ident(), self.tracer.sample_interval)
+            self._sampler.start()
+        self._token = _current_span.set(self)
+        self.start_ns = time.time_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end_ns = time.time_ns()
+        _current_span.reset(self._token)
+        if exc is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        if self.parent is None:
+            profile = self._sampler.stop() if self._sampler else None
+            self.tracer._finish(self, profile)
+        return False
+
+
+class _NullSpan:
+    """Returned by span() when no trace is active, so instrumentation costs nothing"""
+
+    def set(self, **attributes):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class SamplingProfiler:
+    """Samples one thread's stack at a fixed interval and counts frames"""
+
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.self_counts = collections.Counter()
+        self.total_counts = collections.Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @staticmethod
+    def _label(frame):
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            self.samples += 1
+            self.self_counts[self._label(frame)] += 1
+            seen = set()
+            while frame is not None:
+                code = frame.f_code
+                key = f"{code.co_name} ({os.path.basename(code.co_filename)})"
+                if key not in seen:
+                    seen.add(key)
+                    self.total_counts[key] += 1
+                frame = frame.f_back
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self, top=15):
+        """Stop sampling; returns the hottest lines and functions as shares of samples"""
+        self._stop.set()
+        self._thread.join()
+        samples = max(self.samples, 1)
+        return {
+            'samples': self.samples,
+            'interval_ms': self.interval * 1000,
+            'self': [(label, count / samples) for label, count in self.self_counts.most_common(top)],
+            'total': [(label, count / samples) for label, count in self.total_counts.most_common(top)]
+        }
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    if isinstance(value, (list, tuple)):
+        return {'arrayValue': {'values': [_otlp_value(v) for v in value]}}
+    return {'stringValue': str(value)}
+
+
+def _walk(span, depth=0):
+    yield span, depth
+    for child in span.children:
+        yield from _walk(child, depth + 1)
+
+
+def to_otlp(root):
+    """OTLP/JSON ExportTraceServiceRequest for one finished trace"""
+    spans = []
+    for span, _ in _walk(root):
+        spans.append({
+            'traceId': span.trace_id,
+            'spanId': span.span_id,
+            'parentSpanId': span.parent.span_id if span.parent else '',
+            'name': span.name,
+            'kind': 1,  # SPAN_KIND_INTERNAL
+            'startTimeUnixNano': str(span.start_ns),
+            'endTimeUnixNano': str(span.end_ns),
+            'attributes': [{'key': k, 'value': _otlp_value(v)} for k, v in span.attributes.items()],
+            'status': {'code': 2, 'message': span.error} if span.error else {'code': 1}
+        })
+    return {
+        'resourceSpans': [{
+            'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': SERVICE_NAME}}]},
+            'scopeSpans': [{'scope': {'name': 'marco.tracing'}, 'spans': spans}]
+        }]
+    }
+
+
+class Tracer:
+    """Collects finished traces and exports them"""
+
+    def __init__(self, history=20, trace_file=None, endpoint=None):
+        self.runs = collections.deque(maxlen=history)
+        self.trace_file = trace_file
+        self.endpoint = endpoint.rstrip('/') + '/v1/traces' if endpoint else None
+        self.sampling = False
+        self.sample_interval = 0.005
+        self.lock = threading.Lock()
+
+    def trace(self, name, sampling=None, **attributes):
+        """A span; the root of a new trace when no span is active.
+
+        sampling turns the sampling profiler on for a root span; None uses
+        the tracer-wide default.
+        """
+        return Span(self, name, attributes, self.sampling if sampling is None else sampling)
+
+    def begin(self, name, sampling=None, **attributes):
+        """Start a root span for a script run that is ended with finish().
+
+        A Streamlit rerun or error can interrupt a script before it calls
+        finish(). Whatever such a run left open on this thread is abandoned
+        here, so the new run is always a root and never nests under it.
+        """
+        stale = _current_span.get()
+        while stale is not None:
+            if stale._sampler is not None:
+                stale._sampler.stop()
+                stale._sampler = None
+            stale = stale.parent
+        _current_span.set(None)
+        return self.trace(name, sampling, **attributes).start()
+
+    def _finish(self, root, profile):
+        run = {
+            'name': root.name,
+            'trace_id': root.trace_id,
+            'started': root.start_ns / 1e9,
+            'duration_ms': root.duration_ms,
+            'error': root.error,
+            'stages': [(span.name, depth, span.duration_ms) for span, depth in _walk(root)],
+            'profile': profile
+        }
+        if profile:
+            root.attributes['profile.samples'] = profile['samples']
+            root.attributes['profile.top'] = [f"{label} {share:.0%}" for label, share in profile['self']]
+        with self.lock:
+            self.runs.append(run)
+        if self.trace_file or self.endpoint:
+            self._export(to_otlp(root))
+
+    def _export(self, payload):
+        body = json.dumps(payload)
+        if self.trace_file:
+            directory = os.path.dirname(self.trace_file)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            with self.lock, open(self.trace_file, 'a', encoding='utf-8') as f:
+                f.write(body + '\n')
+        if self.endpoint:
+            # Posted off the request thread; a missing collector must not slow the app down
+            threading.Thread(target=self._post, args=(body,), daemon=True).start()
+
+    def _post(self, body):
+        request = urllib.request.Request(
+            self.endpoint, data=body.encode('utf-8'), headers={'Content-Type': 'application/json'}
+        )
+        try:
+            urllib.request.urlopen(request, timeout=2).close()
+        except OSError:
+            pass
+
+    def recent(self, name=None):
+        """Finished runs, newest first, optionally only those with a given root name"""
+        with self.lock:
+            runs = list(self.runs)
+        return [run for run in reversed(runs) if name is None or run['name'] == name]
+
+
+tracer = Tracer(
+    trace_file=os.environ.get('MARCO_TRACE_FILE'),
+    endpoint=os.environ.get('OTEL_EXPORTER_OTLP_ENDPOINT')
+)
+
+
+def span(name, **attributes):
+    """Child span of the active trace, or a no-op outside any trace"""
+    parent = _current_span.get()
+    if parent is None:
+        return NULL_SPAN
+    return Span(parent.tracer, name, attributes)
+
+
+def traced(name=None, root=False):
+    """Decorator recording each call as a span of the active trace.
+
+    With root=True a call outside any trace starts its own, so entry points
+    such as analyze_document are traced however they are invoked.
+    """
+    def decorator(function):
+        label = name or function.__qualname__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with (tracer.trace(label) if root else span(label)):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def session_sampling(run_name):
+    """Whether this Streamlit session switched the profiler on for run_name"""
+    import streamlit as st
+
+    return st.session_state.get(f"sampling_{run_name}", tracer.sampling)
+
+
+def performance_panel(run_name, title="Performance"):
+    """Streamlit expander with per-stage timings for the last runs of run_name.
+
+    The profiler checkbox is kept in the session's own state and read with
+    session_sampling() when the next run starts, so one analyst's toggle does
+    not affect other sessions.
+    """
+    import pandas as pd
+    import streamlit as st
+
+    with st.expander(title):
+        st.checkbox(
+            "Sampling profiler",
+            value=tracer.sampling,
+            key=f"sampling_{run_name}",
+            help="Sample the stack every 5 ms during your next runs to show hot functions"
+        )
+        runs = tracer.recent(run_name)
+        if not runs:
+            st.caption("No runs recorded yet")
+            return
+
+        latest = runs[0]
+        st.caption(f"Last run: {latest['duration_ms']:.1f} ms over {len(latest['stages'])} span(s)")
+        st.dataframe(
+            pd.DataFrame({
+                "Stage": [" " * depth + name for name, depth, _ in latest['stages']],
+                "Time (ms)": [duration for _, _, duration in latest['stages']]
+            }),
+            hide_index=True,
+            column_config={"Time (ms)": st.column_config.NumberColumn(format="%.2f")}
+        )
+
+        # Mean and worst time per stage across the recorded runs
+        rows = [(name, duration) for run in runs for name, _, duration in run['stages']]
+        history = pd.DataFrame(rows, columns=["Stage", "Time (ms)"]).groupby("Stage", sort=False)["Time (ms)"]
+        st.caption(f"Across the last {len(runs)} run(s)")
+        st.dataframe(
+            pd.DataFrame({"Mean (ms)": history.mean(), "Max (ms)": history.max()}).reset_index(),
+            hide_index=True,
+            column_config={
+                "Mean (ms)": st.column_config.NumberColumn(format="%.2f"),
+                "Max (ms)": st.column_config.NumberColumn(format="%.2f")
+            }
+        )
+
+        if latest['profile']:
+            st.caption(f"Hottest lines ({latest['profile']['samples']} samples)")
+            st.dataframe(
+                pd.DataFrame(latest['profile']['self'], columns=["Location", "Share"]),
+                hide_index=True,
+                column_config={"Share": st.column_config.ProgressColumn(min_value=0.0, max_value=1.0)}
+            )